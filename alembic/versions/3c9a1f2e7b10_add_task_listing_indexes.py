@@ -0,0 +1,52 @@
+"""Add composite indexes for task listing
+
+Revision ID: 3c9a1f2e7b10
+Revises: 75bdf6759ebf
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a1f2e7b10'
+down_revision: Union[str, None] = '75bdf6759ebf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_tasks_user_id_created_at', ['user_id', sa.text('created_at DESC'), sa.text('id DESC')]),
+    ('ix_tasks_user_id_status_created_at', ['user_id', 'status', sa.text('created_at DESC'), sa.text('id DESC')]),
+    ('ix_tasks_user_id_ended_at', ['user_id', 'ended_at', 'id']),
+    ('ix_tasks_user_id_name', ['user_id', 'name', 'id']),
+    ('ix_tasks_user_id_status', ['user_id', 'status', 'id']),
+    ('ix_tasks_user_id_parent_id', ['user_id', 'parent_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_context().dialect.name == 'postgresql':
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+        with op.get_context().autocommit_block():
+            for name, columns in INDEXES:
+                op.create_index(name, 'tasks', columns, unique=False,
+                                postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, columns in INDEXES:
+            op.create_index(name, 'tasks', columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, _ in reversed(INDEXES):
+                op.drop_index(name, table_name='tasks',
+                              postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='tasks')
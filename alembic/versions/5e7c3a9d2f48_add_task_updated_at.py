@@ -0,0 +1,30 @@
+"""Add task updated_at
+
+Revision ID: 5e7c3a9d2f48
+Revises: 8d4e2b6a1c57
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e7c3a9d2f48'
+down_revision: Union[str, None] = '8d4e2b6a1c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable without a default, so adding it does not rewrite the table. Existing rows
+    # keep NULL until their next write, which is all the task ETags need to notice a change.
+    op.add_column('tasks', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tasks', 'updated_at')
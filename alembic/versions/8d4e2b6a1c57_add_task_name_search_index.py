@@ -0,0 +1,59 @@
+"""Add task name search index
+
+Revision ID: 8d4e2b6a1c57
+Revises: 3c9a1f2e7b10
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4e2b6a1c57'
+down_revision: Union[str, None] = '3c9a1f2e7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "name, content='tasks', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF name ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+    "INSERT INTO tasks_fts(rowid, name) VALUES (new.id, new.name); END",
+    # Index rows that existed before the shadow table.
+    "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_context().dialect.name
+    if dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        with op.get_context().autocommit_block():
+            op.create_index('ix_tasks_name_trgm', 'tasks', ['name'], unique=False,
+                            postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+                            postgresql_concurrently=True, if_not_exists=True)
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_context().dialect.name
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_tasks_name_trgm', table_name='tasks',
+                          postgresql_concurrently=True, if_exists=True)
+    elif dialect == 'sqlite':
+        for trigger in ('tasks_fts_ai', 'tasks_fts_ad', 'tasks_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS tasks_fts")
@@ -0,0 +1,59 @@
+"""Add tasks_archive for finished tasks
+
+Revision ID: 9b2f6d4e8a13
+Revises: 5e7c3a9d2f48
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2f6d4e8a13'
+down_revision: Union[str, None] = '5e7c3a9d2f48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_tasks_archive_user_id_created_at', ['user_id', sa.text('created_at DESC'), sa.text('id DESC')]),
+    ('ix_tasks_archive_user_id_status_created_at',
+     ['user_id', 'status', sa.text('created_at DESC'), sa.text('id DESC')]),
+    ('ix_tasks_archive_user_id_parent_id', ['user_id', 'parent_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_context().dialect.name
+    # Reuse the taskstatus type created with the tasks table.
+    status = (postgresql.ENUM(name='taskstatus', create_type=False) if dialect == 'postgresql'
+              else sa.Enum('RUNNING', 'COMPLETED', 'KILLED', name='taskstatus'))
+    # A new, empty table: no locks on tasks, and its indexes are built before it has rows.
+    op.create_table('tasks_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('status', status, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('ended_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('parent_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    for name, columns in INDEXES:
+        op.create_index(name, 'tasks_archive', columns, unique=False)
+    if dialect == 'postgresql':
+        op.create_index('ix_tasks_archive_name_trgm', 'tasks_archive', ['name'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Archived tasks are dropped with the table.
+    op.drop_table('tasks_archive')
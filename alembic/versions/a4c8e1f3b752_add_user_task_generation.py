@@ -0,0 +1,29 @@
+"""Add users.task_generation
+
+Revision ID: a4c8e1f3b752
+Revises: 9b2f6d4e8a13
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e1f3b752'
+down_revision: Union[str, None] = '9b2f6d4e8a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant default is a catalog-only change on Postgres 11+, so users is not rewritten.
+    op.add_column('users', sa.Column('task_generation', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'task_generation')
@@ -0,0 +1,104 @@
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy.engine import Engine
+
+from src.auth.hashing import hash_password
+from src.auth.models import User
+from src.db.bulk import finish_load
+from src.db.database import Base
+from src.db.seed import load_tasks, load_users
+from src.task.constants import TaskStatus
+from src.task.models import Task
+
+BENCH_PASSWORD = "benchmark"
+SEARCH_WORDS = ("build", "deploy", "backup", "compile", "index", "render", "sync", "report")
+
+
+@dataclass
+class DatasetSpec:
+    users: int = 10
+    tasks: int = 10_000
+    trees: int = 10
+    tree_depth: int = 1_000
+
+
+@dataclass
+class Dataset:
+    spec: DatasetSpec
+    usernames: list[str]
+    # Ids of the first user's flat tasks, who every authenticated scenario runs as.
+    task_ids: range
+    tree_roots: list[int] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def describe(self) -> dict:
+        return asdict(self.spec)
+
+
+def seed(engine: Engine, spec: DatasetSpec) -> Dataset:
+    """Recreate the schema and load a deterministic dataset.
+
+    Tasks are spread evenly across ``spec.users`` users with explicit ids, and the first
+    user additionally owns ``spec.trees`` fork chains ``spec.tree_depth`` tasks deep.
+    """
+    started = time.perf_counter()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    # Every user shares one password, so bcrypt only runs once.
+    hashed = hash_password(BENCH_PASSWORD)
+    usernames = [f"bench-{i}" for i in range(spec.users)]
+    load_users(engine, (
+        {"id": i + 1, "username": name, "hashed_password": hashed, "is_admin": False}
+        for i, name in enumerate(usernames)
+    ))
+
+    epoch = datetime(2024, 1, 1)
+    per_user = spec.tasks // spec.users
+
+    def flat_tasks():
+        for n in range(per_user * spec.users):
+            created = epoch + timedelta(seconds=n)
+            yield {
+                "id": n + 1,
+                "name": f"task {n} {SEARCH_WORDS[n % len(SEARCH_WORDS)]}",
+                "status": TaskStatus.RUNNING,
+                "created_at": created,
+                "started_at": created,
+                "updated_at": created,
+                "user_id": n // per_user + 1,
+            }
+
+    load_tasks(engine, flat_tasks())
+
+    next_id = per_user * spec.users + 1
+    roots = [next_id + tree * spec.tree_depth for tree in range(spec.trees)]
+
+    def chains():
+        for root in roots:
+            for depth in range(spec.tree_depth):
+                created = epoch + timedelta(seconds=depth)
+                yield {
+                    "id": root + depth,
+                    "name": f"chain {root} depth {depth}",
+                    "status": TaskStatus.RUNNING,
+                    "created_at": created,
+                    "started_at": created,
+                    "updated_at": created,
+                    "parent_id": root + depth - 1 if depth else None,
+                    "user_id": 1,
+                }
+
+    load_tasks(engine, chains())
+
+    finish_load(engine, [User.__table__, Task.__table__])
+
+    return Dataset(
+        spec=spec,
+        usernames=usernames,
+        task_ids=range(1, per_user + 1),
+        tree_roots=roots,
+        seconds=time.perf_counter() - started,
+    )
@@ -0,0 +1,177 @@
+"""Seed a benchmark database, drive the API and compare the results to a baseline.
+
+    python -m benchmarks.run --tasks 1000000 --driver uvicorn --baseline benchmarks/baseline.json
+
+The database URL must point at a dedicated database: its tables are dropped and reseeded.
+"""
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+import typer
+
+app = typer.Typer(add_completion=False)
+
+# Settings are read on import of src, so defaults must be in the environment first.
+BENCH_ENV_DEFAULTS = {
+    "SECRET_KEY": "benchmark-secret",
+    "HASH_ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def asgi_client():
+    from src.main import app as api
+
+    transport = httpx.ASGITransport(app=api)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+        yield client
+
+
+@asynccontextmanager
+async def uvicorn_client(workers: int):
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    if (await client.get("/openapi.json")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not start")
+                await asyncio.sleep(0.2)
+            yield client
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+async def _run(driver: str, workers: int, dataset, scenarios: List[str], requests: int,
+               concurrency: int, warmup: int) -> dict:
+    from benchmarks.dataset import BENCH_PASSWORD
+    from benchmarks.scenarios import SCENARIOS, Context, run_scenario
+
+    client_factory = asgi_client() if driver == "asgi" else uvicorn_client(workers)
+    results = {}
+    async with client_factory as client:
+        login = await client.post(
+            "/auth/login", json={"username": dataset.usernames[0], "password": BENCH_PASSWORD}
+        )
+        login.raise_for_status()
+        ctx = Context(client, dataset, {"Authorization": f"Bearer {login.json()['access_token']}"})
+        for name in scenarios:
+            results[name] = await run_scenario(ctx, SCENARIOS[name], requests, concurrency, warmup)
+            typer.echo(f"{name:12} " + "  ".join(f"{key}={value}" for key, value in results[name].items()))
+    return results
+
+
+@app.command()
+def run(
+        database_url: str = typer.Option("sqlite:///./benchmark.db", envvar="BENCH_DATABASE_URL",
+                                         help="Dedicated database; it is dropped and reseeded."),
+        driver: str = typer.Option("asgi", help="asgi (in-process) or uvicorn (real server)."),
+        workers: int = typer.Option(1, help="uvicorn worker processes."),
+        users: int = typer.Option(10),
+        tasks: int = typer.Option(10_000, help="Flat tasks, spread evenly across users."),
+        trees: int = typer.Option(10, help="Deep fork chains owned by the first user."),
+        tree_depth: int = typer.Option(1_000),
+        scenario: Optional[List[str]] = typer.Option(None, help="Scenarios to run (default: all)."),
+        requests: int = typer.Option(500, help="Measured requests per scenario."),
+        concurrency: int = typer.Option(16),
+        warmup: int = typer.Option(20, help="Unmeasured requests per scenario."),
+        output: Path = typer.Option(Path("benchmarks/results/latest.json")),
+        baseline: Optional[Path] = typer.Option(None, help="Fail if results regress past this baseline."),
+        threshold: float = typer.Option(0.2, help="Allowed regression as a fraction."),
+):
+    if driver not in ("asgi", "uvicorn"):
+        raise typer.BadParameter("driver must be asgi or uvicorn")
+
+    os.environ["DATABASE_URL"] = database_url
+    for key, value in BENCH_ENV_DEFAULTS.items():
+        os.environ.setdefault(key, value)
+
+    from benchmarks.dataset import DatasetSpec, seed
+    from benchmarks.scenarios import SCENARIOS
+    from benchmarks.stats import find_regressions
+    from src.auth.hashing import hasher
+    from src.db.database import engine
+
+    names = scenario or list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise typer.BadParameter(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    typer.echo(f"Seeding {engine.dialect.name}: {users} users, {tasks} tasks, {trees}x{tree_depth} chains")
+    dataset = seed(engine, DatasetSpec(users=users, tasks=tasks, trees=trees, tree_depth=tree_depth))
+    typer.echo(f"Seeded in {dataset.seconds:.1f}s")
+
+    try:
+        scenario_results = asyncio.run(_run(driver, workers, dataset, names, requests, concurrency, warmup))
+    finally:
+        hasher.shutdown()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "driver": driver,
+            "workers": workers,
+            "database": engine.dialect.name,
+            "dataset": dataset.describe(),
+            "seed_seconds": round(dataset.seconds, 2),
+            "requests": requests,
+            "concurrency": concurrency,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "scenarios": scenario_results,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    typer.echo(f"Results written to {output}")
+
+    if baseline is None:
+        return
+    if not baseline.exists():
+        typer.echo(f"No baseline at {baseline}; nothing to compare against.")
+        return
+    previous = json.loads(baseline.read_text())
+    for key in ("driver", "database", "dataset", "concurrency"):
+        if previous.get("meta", {}).get(key) != results["meta"][key]:
+            typer.echo(f"Warning: baseline {key} differs ({previous.get('meta', {}).get(key)!r})")
+    regressions = find_regressions(results, previous, threshold)
+    if regressions:
+        typer.echo("Regressions past the threshold:")
+        for line in regressions:
+            typer.echo(f"  {line}")
+        raise typer.Exit(code=1)
+    typer.echo("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    app()
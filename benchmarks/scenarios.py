@@ -0,0 +1,103 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import httpx
+
+from benchmarks.dataset import BENCH_PASSWORD, SEARCH_WORDS, Dataset
+from benchmarks.stats import summarize
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    dataset: Dataset
+    headers: dict
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    # Issues request ``i`` of the run; scenarios pick distinct targets by index.
+    request: Callable[[Context, int], Awaitable[httpx.Response]]
+    ok_statuses: tuple = (200,)
+    # Scenarios that consume their targets cannot repeat them for warmup.
+    warmup: bool = True
+
+
+def _login(ctx: Context, i: int):
+    username = ctx.dataset.usernames[i % len(ctx.dataset.usernames)]
+    return ctx.client.post("/auth/login", json={"username": username, "password": BENCH_PASSWORD})
+
+
+def _list(ctx: Context, i: int):
+    return ctx.client.get("/tasks", params={"limit": 20}, headers=ctx.headers)
+
+
+def _list_deep_offset(ctx: Context, i: int):
+    offset = (i * 997) % max(len(ctx.dataset.task_ids) - 20, 1)
+    return ctx.client.get("/tasks", params={"limit": 20, "offset": offset}, headers=ctx.headers)
+
+
+def _search(ctx: Context, i: int):
+    word = SEARCH_WORDS[i % len(SEARCH_WORDS)]
+    return ctx.client.get("/tasks", params={"search": word, "limit": 20}, headers=ctx.headers)
+
+
+def _fork(ctx: Context, i: int):
+    ids = ctx.dataset.task_ids
+    return ctx.client.post(f"/tasks/{ids[(i * 7919) % len(ids)]}/fork", headers=ctx.headers)
+
+
+def _kill(ctx: Context, i: int):
+    # Walk down from the newest tasks so forks (which pick from anywhere) rarely collide.
+    ids = ctx.dataset.task_ids
+    return ctx.client.delete(f"/tasks/{ids[-1 - i % len(ids)]}", headers=ctx.headers)
+
+
+def _tree(ctx: Context, i: int):
+    roots = ctx.dataset.tree_roots
+    return ctx.client.get(f"/tasks/{roots[i % len(roots)]}/tree", headers=ctx.headers)
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("login", _login),
+        Scenario("list", _list),
+        Scenario("list_offset", _list_deep_offset),
+        Scenario("search", _search),
+        Scenario("tree", _tree),
+        Scenario("fork", _fork, ok_statuses=(201,)),
+        Scenario("kill", _kill, warmup=False),
+    )
+}
+
+
+async def run_scenario(ctx: Context, scenario: Scenario, requests: int, concurrency: int,
+                       warmup: int) -> dict:
+    """Issue ``requests`` requests from ``concurrency`` workers and summarize their latencies."""
+    if scenario.warmup:
+        for i in range(warmup):
+            await scenario.request(ctx, i)
+
+    latencies: list[float] = []
+    errors = 0
+    indexes = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in indexes:
+            start = time.perf_counter()
+            try:
+                response = await scenario.request(ctx, i)
+                failed = response.status_code not in scenario.ok_statuses
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
@@ -0,0 +1,82 @@
+"""Micro-benchmark: list page serialization through pydantic + FastAPI vs. the orjson fast path.
+
+    python -m benchmarks.serialization --rows 1000 --repeat 200
+"""
+import asyncio
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import typer
+
+app = typer.Typer(add_completion=False)
+
+
+def sample_page(rows: int) -> dict:
+    from src.task.constants import TaskStatus
+    from src.task.encoding import TASK_FIELDS
+
+    Row = namedtuple("Row", TASK_FIELDS)
+    start = datetime(2024, 1, 1, 12, 0, 0, 123456)
+    items = []
+    for n in range(rows):
+        created = start + timedelta(seconds=n)
+        finished = n % 3 == 0
+        items.append(Row(
+            id=n + 1,
+            name=f"rsync --archive /srv/data/{n} backup-{n}",
+            status=TaskStatus.COMPLETED if finished else TaskStatus.RUNNING,
+            created_at=created,
+            started_at=created,
+            ended_at=created + timedelta(minutes=5) if finished else None,
+            parent_id=n if n % 4 else None,
+        ))
+    return dict(total=rows * 10, page=1, page_size=rows, total_pages=10, next_page=2, previous_page=None,
+                next_cursor="eyJpZCI6MX0", prev_cursor=None, items=items)
+
+
+def _best(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+@app.command()
+def run(rows: int = typer.Option(1000, help="Tasks per page."),
+        repeat: int = typer.Option(100, help="Runs per path; the best one is reported.")):
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+
+    from src.task.encoding import encode_page
+    from src.task.schemas import PaginatedTaskResponse
+
+    page = sample_page(rows)
+    field = create_model_field("Response", PaginatedTaskResponse, mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def model_path() -> bytes:
+        # What list_tasks did before: build the model, then let FastAPI validate and dump it again.
+        model = PaginatedTaskResponse(**page)
+        content = loop.run_until_complete(serialize_response(field=field, response_content=model))
+        return JSONResponse(content).body
+
+    def fast_path() -> bytes:
+        return encode_page(page)
+
+    try:
+        if model_path() != fast_path():
+            typer.echo("The fast path's output differs from the response model's", err=True)
+            raise typer.Exit(code=1)
+        slow, fast = _best(model_path, repeat), _best(fast_path, repeat)
+    finally:
+        loop.close()
+    typer.echo(f"{rows} rows, best of {repeat}: model {slow * 1000:.2f} ms, "
+               f"orjson {fast * 1000:.2f} ms ({slow / fast:.1f}x faster), output identical")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,46 @@
+import math
+from typing import Optional
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Latency percentiles (ms) and throughput for one scenario."""
+    ordered = sorted(latencies)
+    summary = {"requests": len(latencies), "errors": errors}
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(ordered, pct) * 1000, 3)
+    summary["mean_ms"] = round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0
+    summary["rps"] = round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0
+    return summary
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Scenarios whose p95 latency or throughput is worse than ``baseline`` by more than ``threshold``.
+
+    ``threshold`` is a fraction: 0.2 tolerates a 20% slower p95 or 20% lower throughput.
+    """
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous: Optional[dict] = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {current['p95_ms']:.1f}ms vs baseline {previous['p95_ms']:.1f}ms"
+            )
+        if previous["rps"] and current["rps"] < previous["rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: {current['rps']:.1f} req/s vs baseline {previous['rps']:.1f} req/s"
+            )
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: {current['errors']} errors vs baseline {previous['errors']}")
+    return regressions
@@ -1,14 +1,25 @@
 import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
 
 import typer
+from sqlalchemy import select, update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from src.auth.models import User
 from src.auth.service import get_password_hash
 from src.common.logger import get_logger
-from src.db.database import SessionLocal
+from src.config import settings
+from src.db import seed as seeding
+from src.db.bulk import LoadStats, finish_load, next_id
+from src.db.database import SessionLocal, engine
 from src.db.utils import check_db_connection
+from src.task.archive import archive_finished_tasks
+from src.task.constants import TaskStatus
+from src.task.models import Task
 
 app = typer.Typer()
 logger = get_logger(__name__)
@@ -61,5 +72,107 @@ def create_admin(
         sys.exit(1)
 
 
+def _progress(label: str, total: Optional[int] = None):
+    started = time.perf_counter()
+
+    def report(loaded: int):
+        elapsed = time.perf_counter() - started
+        rate = loaded / elapsed if elapsed else 0
+        of_total = f"/{total}" if total else ""
+        typer.echo(f"\r{label}: {loaded}{of_total} rows ({rate:,.0f} rows/s)", nl=False)
+
+    return report
+
+
+def _done(stats: LoadStats):
+    typer.echo(f"\r{stats.table}: {stats.rows} rows in {stats.seconds:.1f}s ({stats.rows_per_second:,.0f} rows/s)")
+
+
+def _user_ids() -> dict[str, int]:
+    with engine.connect() as conn:
+        return {username: user_id for user_id, username in conn.execute(select(User.id, User.username))}
+
+
+@app.command()
+def seed(
+        users: int = typer.Option(100, help="Synthetic users to create."),
+        tasks: int = typer.Option(100_000, help="Synthetic tasks, spread across the new users."),
+        password: str = typer.Option("password", help="Password shared by every synthetic user."),
+        fork_ratio: float = typer.Option(0.3, help="Share of tasks forked from an earlier task."),
+        max_depth: int = typer.Option(8, help="Deepest fork tree generated."),
+        running: float = typer.Option(0.6, help="Relative weight of running tasks."),
+        completed: float = typer.Option(0.3, help="Relative weight of completed tasks."),
+        killed: float = typer.Option(0.1, help="Relative weight of killed tasks."),
+        random_seed: int = typer.Option(0, "--seed", help="Seed for reproducible data."),
+):
+    """Bulk-load synthetic users and tasks with fork trees and a status mix."""
+    first_user = next_id(engine, User.__table__)
+    _done(seeding.load_users(
+        engine, seeding.generate_users(users, first_user, password), _progress("users", users)
+    ))
+    _done(seeding.load_tasks(engine, seeding.generate_tasks(
+        tasks,
+        next_id(engine, Task.__table__),
+        list(range(first_user, first_user + users)),
+        fork_ratio=fork_ratio,
+        max_depth=max_depth,
+        status_mix={TaskStatus.RUNNING: running, TaskStatus.COMPLETED: completed, TaskStatus.KILLED: killed},
+        seed=random_seed,
+    ), _progress("tasks", tasks)))
+    finish_load(engine, [User.__table__, Task.__table__])
+    logger.info("Seeded %s users and %s tasks", users, tasks)
+
+
+@app.command("import-users")
+def import_users(path: Path = typer.Argument(..., exists=True, dir_okay=False, help="NDJSON or CSV file.")):
+    """Bulk-load users with a username and either a password or a hashed_password."""
+    rows = seeding.user_rows(seeding.read_records(path), next_id(engine, User.__table__))
+    _done(seeding.load_users(engine, rows, _progress("users")))
+    finish_load(engine, [User.__table__])
+
+
+@app.command("import-tasks")
+def import_tasks(
+        path: Path = typer.Argument(..., exists=True, dir_okay=False, help="NDJSON or CSV file, e.g. from /tasks/export."),
+        owner: Optional[str] = typer.Option(None, help="Username owning rows without user_id or username."),
+        keep_ids: bool = typer.Option(True, help="Keep the file's ids; --no-keep-ids renumbers and remaps parents."),
+):
+    """Bulk-load tasks, for example to restore a /tasks/export dump."""
+    user_ids = _user_ids()
+    if owner is not None and owner not in user_ids:
+        typer.echo(f"User '{owner}' does not exist.")
+        raise typer.Exit(code=1)
+
+    rows = seeding.task_rows(
+        seeding.read_records(path),
+        next_id(engine, Task.__table__),
+        user_ids,
+        default_user_id=user_ids.get(owner) if owner else None,
+        keep_ids=keep_ids,
+    )
+    try:
+        _done(seeding.load_tasks(engine, rows, _progress("tasks")))
+    except (ValueError, KeyError) as e:
+        typer.echo(f"\nInvalid input: {e}")
+        raise typer.Exit(code=1)
+    finish_load(engine, [Task.__table__])
+    # The load bypasses the service layer, so invalidate every user's listing ETags here.
+    with engine.begin() as conn:
+        conn.execute(update(User).values(task_generation=User.task_generation + 1))
+
+
+@app.command("archive-tasks")
+def archive_tasks(
+        older_than_days: float = typer.Option(
+            settings.TASK_ARCHIVE_AFTER_DAYS, help="Archive tasks that ended more than this many days ago."
+        ),
+        batch_size: int = typer.Option(settings.TASK_ARCHIVE_BATCH_SIZE, help="Tasks moved per transaction."),
+):
+    """Move finished tasks to tasks_archive; run again to move parents whose forks just moved."""
+    with SessionLocal() as db:
+        moved = archive_finished_tasks(db, timedelta(days=older_than_days), batch_size)
+    typer.echo(f"Archived {moved} tasks.")
+
+
 if __name__ == "__main__":
     app()
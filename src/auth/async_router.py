@@ -0,0 +1,22 @@
+from fastapi import Depends, APIRouter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.async_service import authenticate_user, register_user
+from src.auth.schemas import UserCreate, UserResponse, Token, LoginInput
+from src.auth.service import create_access_token
+from src.common.profiling import ProfiledRoute
+from src.db.database import get_async_db
+
+router = APIRouter(prefix="/auth", tags=["Auth"], route_class=ProfiledRoute)
+
+
+@router.post("/login", response_model=Token)
+async def login(form_data: LoginInput, db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate_user(db, form_data.username, form_data.password)
+    token = create_access_token(data={"sub": user.username})
+    return {"access_token": token}
+
+
+@router.post("/register", response_model=UserResponse, status_code=201)
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    return await register_user(db, user_data)
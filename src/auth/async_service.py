@@ -0,0 +1,68 @@
+from typing import Optional
+
+from fastapi import Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import service
+from src.auth.cache import UserSnapshot, principal_cache
+from src.auth.models import User
+from src.auth.schemas import UserCreate
+from src.common.admission import enforce_user_rate_limit
+from src.common.exceptions import UnauthenticatedException
+from src.common.logger import get_logger
+from src.common.profiling import authorize_profile, profile_phase
+from src.db.database import get_async_db
+
+logger = get_logger(__name__)
+
+# Query, login and registration logic lives in src.auth.service; these wrappers run it
+# on an AsyncSession; bcrypt runs in the password hashing process pool.
+
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+    return await db.run_sync(service.get_user_by_username, username)
+
+
+async def _save_user(db: AsyncSession, user: User) -> None:
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+
+
+def _session_io(db: AsyncSession) -> tuple[service.GetUser, service.SaveUser]:
+    return (lambda username: get_user_by_username(db, username),
+            lambda user: _save_user(db, user))
+
+
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> User:
+    return await service.authenticate_with(*_session_io(db), username, password)
+
+
+async def get_current_user(
+        authorization: str = Header(..., alias="Authorization"),
+        db: AsyncSession = Depends(get_async_db),
+) -> UserSnapshot:
+    with profile_phase("auth"):
+        token = service.get_bearer_token(authorization)
+        principal = principal_cache.get(token)
+        if principal is None:
+            token_data = service.decode_access_token(token)
+            user = await get_user_by_username(db, token_data.username)
+            if user is None:
+                logger.warning("Token user not found in database")
+                raise UnauthenticatedException("User not found")
+
+            logger.debug("Authenticated user: %s", user.username)
+            principal = service.cache_principal(token, token_data, user)
+
+    authorize_profile(principal)
+    enforce_user_rate_limit(principal.id)
+    return principal
+
+
+async def get_current_admin_user(current_user: UserSnapshot = Depends(get_current_user)):
+    return service.get_current_admin_user(current_user)
+
+
+async def register_user(db: AsyncSession, user_data: UserCreate) -> User:
+    return await service.register_with(*_session_io(db), user_data)
@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+
+from src.auth.models import User
+from src.common.cache import TTLCache
+from src.common.metrics import register_cache_metrics
+from src.config import settings
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """The authenticated principal, detached from any database session."""
+    id: int
+    username: str
+    is_admin: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(id=user.id, username=user.username, is_admin=bool(user.is_admin))
+
+
+# Bearer token -> UserSnapshot. Entries never outlive the token's own expiry.
+principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+register_cache_metrics("auth_cache", principal_cache.stats, "principal cache")
+
+
+def invalidate_user(username: str) -> int:
+    """Drop this process's cached principals for ``username``; returns how many were dropped.
+
+    No API route changes an existing user, and the cache is per process, so changes made
+    with create_admin.py or SQL are only picked up once AUTH_CACHE_TTL_SECONDS passes.
+    Call this from any in-process path that changes a user's admin flag or removes them.
+    """
+    return principal_cache.invalidate_where(lambda _, snapshot: snapshot.username == username)
@@ -0,0 +1,104 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+
+from src.common.exceptions import ServiceUnavailableException
+from src.config import settings
+
+# min_rounds makes needs_update() flag hashes created with a lower work factor,
+# so they are transparently upgraded on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain, hashed)
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool so it never occupies request threads.
+
+    At most ``max_pending`` operations may be running or queued; beyond that callers
+    are rejected with a 503 rather than piling up behind the pool.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs threads is unsafe.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def submit(self, fn, *args) -> Future:
+        if self.workers <= 0:
+            future = Future()
+            future.set_result(fn(*args))
+            return future
+
+        if not self._slots.acquire(blocking=False):
+            raise ServiceUnavailableException("Too many concurrent password operations", retry_after=1)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS if settings.PASSWORD_HASH_WORKERS is not None else os.cpu_count() or 1,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+def hash_password(password: str) -> str:
+    return hasher.submit(_hash, password).result()
+
+
+def verify_and_update(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return hasher.submit(_verify_and_update, plain, hashed).result()
+
+
+async def _run_async(fn, *args):
+    if hasher.workers <= 0:
+        # Inline hashing would block the event loop; a threadpool thread waits instead.
+        return await run_in_threadpool(fn, *args)
+    return await asyncio.wrap_future(hasher.submit(fn, *args))
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_async(_hash, password)
+
+
+async def verify_and_update_async(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return await _run_async(_verify_and_update, plain, hashed)
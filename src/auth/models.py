@@ -10,3 +10,6 @@ class User(Base):
     username = Column(String, unique=True, nullable=False, index=True)
     hashed_password = Column(String, nullable=False)
     is_admin = Column(Boolean, default=False)
+    # Bumped in the same transaction as every write to the user's tasks; GET /tasks ETags
+    # derive from it. Keep in sync with alembic revision a4c8e1f3b752.
+    task_generation = Column(Integer, nullable=False, default=0, server_default="0")
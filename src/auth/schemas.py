@@ -25,3 +25,4 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     username: str | None = None
+    exp: int | None = None
@@ -1,15 +1,20 @@
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 
 from fastapi import Depends, Header
+from fastapi.concurrency import run_in_threadpool
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
+from src.auth.cache import UserSnapshot, principal_cache
+from src.auth.hashing import hash_password, hash_password_async, verify_and_update, verify_and_update_async
 from src.auth.models import User
 from src.auth.schemas import TokenData, UserCreate
+from src.common.admission import enforce_user_rate_limit
 from src.common.exceptions import DuplicateEntryException, UnauthorizedException, UnauthenticatedException
 from src.common.logger import get_logger
+from src.common.profiling import authorize_profile, profile_phase
 from src.config import settings
 from src.db.database import get_db
 
@@ -20,15 +25,14 @@ SECRET_KEY = settings.SECRET_KEY
 HASH_ALGORITHM = settings.HASH_ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 def verify_password(plain, hashed):
-    return pwd_context.verify(plain, hashed)
+    verified, _ = verify_and_update(plain, hashed)
+    return verified
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return hash_password(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -42,56 +46,111 @@ def get_user_by_username(db: Session, username: str) -> Optional[User]:
     return db.query(User).filter(User.username == username).first()
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
-    user = get_user_by_username(db, username)
-    if not user or not verify_password(password, user.hashed_password):
+# Login and registration rules, shared by both stacks. Each passes its own way to look
+# up a user and to save one; bcrypt is awaited in the hashing pool, so no request
+# thread sits waiting on a hash.
+GetUser = Callable[[str], Awaitable[Optional[User]]]
+SaveUser = Callable[[User], Awaitable[None]]
+
+
+async def authenticate_with(get_user: GetUser, save: SaveUser, username: str, password: str) -> User:
+    user = await get_user(username)
+    if not user:
+        raise UnauthorizedException("Invalid credentials")
+    verified, new_hash = await verify_and_update_async(password, user.hashed_password)
+    if not verified:
         raise UnauthorizedException("Invalid credentials")
+    if new_hash:
+        logger.info("Rehashing password for user %s", user.username)
+        user.hashed_password = new_hash
+        await save(user)
     return user
 
 
-def get_current_user(
-        authorization: str = Header(..., alias="Authorization"),
-        db: Session = Depends(get_db),
-) -> User:
+async def register_with(get_user: GetUser, save: SaveUser, user_data: UserCreate) -> User:
+    if await get_user(user_data.username):
+        raise DuplicateEntryException("Username already registered")
+    hashed_password = await hash_password_async(user_data.password)
+    new_user = User(username=user_data.username, hashed_password=hashed_password)
+    await save(new_user)
+    return new_user
+
+
+def _save_user(db: Session, user: User) -> None:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+
+def _session_io(db: Session) -> tuple[GetUser, SaveUser]:
+    # Queries run in the threadpool, one at a time on the request's session.
+    return (lambda username: run_in_threadpool(get_user_by_username, db, username),
+            lambda user: run_in_threadpool(_save_user, db, user))
+
+
+async def authenticate_user(db: Session, username: str, password: str) -> User:
+    return await authenticate_with(*_session_io(db), username, password)
+
+
+async def register_user(db: Session, user_data: UserCreate) -> User:
+    return await register_with(*_session_io(db), user_data)
+
+
+def get_bearer_token(authorization: str) -> str:
     try:
         scheme, token = authorization.split()
         if scheme.lower() != "bearer":
             raise UnauthenticatedException("Invalid auth scheme")
     except ValueError:
         raise UnauthenticatedException("Invalid Authorization header format")
+    return token
+
 
+def decode_access_token(token: str) -> TokenData:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[HASH_ALGORITHM])
         username = payload.get("sub")
         if not username:
             logger.warning("Token missing subject")
             raise UnauthenticatedException("Invalid token payload")
-        token_data = TokenData(username=username)
+        return TokenData(username=username, exp=payload.get("exp"))
     except JWTError as e:
-        logger.warning(f"JWT decode error: {str(e)}")
+        logger.warning("JWT decode error: %s", e)
         raise UnauthenticatedException("Invalid token")
 
-    user = get_user_by_username(db, token_data.username)
-    if user is None:
-        logger.warning("Token user not found in database")
-        raise UnauthenticatedException("User not found")
 
-    logger.debug(f"Authenticated user: {user.username}")
-    return user
+def cache_principal(token: str, token_data: TokenData, user: User) -> UserSnapshot:
+    principal = UserSnapshot.from_user(user)
+    ttl = token_data.exp - time.time() if token_data.exp is not None else None
+    principal_cache.set(token, principal, ttl=ttl)
+    return principal
 
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)):
+def get_current_user(
+        authorization: str = Header(..., alias="Authorization"),
+        db: Session = Depends(get_db),
+) -> UserSnapshot:
+    with profile_phase("auth"):
+        token = get_bearer_token(authorization)
+        principal = principal_cache.get(token)
+        if principal is None:
+            token_data = decode_access_token(token)
+            user = get_user_by_username(db, token_data.username)
+            if user is None:
+                logger.warning("Token user not found in database")
+                raise UnauthenticatedException("User not found")
+
+            logger.debug("Authenticated user: %s", user.username)
+            principal = cache_principal(token, token_data, user)
+
+    authorize_profile(principal)
+    enforce_user_rate_limit(principal.id)
+    # Lets the routing session keep this user's reads on the primary after they write.
+    db.info["user_id"] = principal.id
+    return principal
+
+
+def get_current_admin_user(current_user: UserSnapshot = Depends(get_current_user)):
     if not current_user.is_admin:
         raise UnauthorizedException("Admin access required")
     return current_user
-
-
-def register_user(db: Session, user_data: UserCreate) -> User:
-    if db.query(User).filter(User.username == user_data.username).first():
-        raise DuplicateEntryException("Username already registered")
-    hashed_password = get_password_hash(user_data.password)
-    new_user = User(username=user_data.username, hashed_password=hashed_password)
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return new_user
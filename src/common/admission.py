@@ -0,0 +1,186 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+
+from fastapi.responses import JSONResponse
+
+from src.common.exceptions import TooManyRequestsException
+from src.common.logger import get_logger
+from src.common.metrics import registry
+from src.config import settings
+
+logger = get_logger(__name__)
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Cheap, or parked without a worker thread or connection for up to minutes: counting
+# these against a class would let a few hundred waiters starve it.
+EXEMPT_PATHS = {"/metrics", "/healthcheck", "/tasks/events"}
+EXEMPT_SUFFIXES = ("/wait",)
+
+requests_rejected_total = registry.counter(
+    "requests_rejected_total", "Requests shed by admission control.", ("route_class", "reason")
+)
+user_rate_limited_total = registry.counter(
+    "user_rate_limited_total", "Requests refused because the user ran out of rate limit tokens."
+)
+
+
+def route_class(scope) -> str | None:
+    """Admission class of an HTTP request, or None for requests that are never queued."""
+    path = scope["path"]
+    if path in EXEMPT_PATHS or path.endswith(EXEMPT_SUFFIXES):
+        return None
+    if path.startswith("/auth/"):
+        return "auth"
+    return "read" if scope["method"] in READ_METHODS else "write"
+
+
+class ConcurrencyGate:
+    """Caps concurrent requests, queueing up to ``max_queue`` more for at most ``timeout`` seconds.
+
+    A finishing request hands its slot straight to the oldest queued one, so queued
+    requests are served in arrival order. A ``limit`` of 0 admits everything.
+    """
+
+    def __init__(self, limit: int, max_queue: int, timeout: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self._queue: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    async def acquire(self) -> str | None:
+        """Take a slot; returns the rejection reason instead when there is none to take."""
+        if self.limit <= 0:
+            return None
+        if self.active < self.limit and not self._queue:
+            self.active += 1
+            return None
+        if len(self._queue) >= self.max_queue:
+            return "queue_full"
+
+        slot = asyncio.get_running_loop().create_future()
+        self._queue.append(slot)
+        try:
+            await asyncio.wait_for(slot, self.timeout)
+        except asyncio.TimeoutError:
+            return "queue_timeout"
+        except BaseException:
+            # Cancelled (the client went away) just after release() handed us the slot.
+            if slot.done() and not slot.cancelled():
+                self.release()
+            raise
+        finally:
+            if slot in self._queue:
+                self._queue.remove(slot)
+        return None
+
+    def release(self) -> None:
+        if self.limit <= 0:
+            return
+        while self._queue:
+            slot = self._queue.popleft()
+            if not slot.done():
+                slot.set_result(None)
+                return
+        self.active -= 1
+
+
+admission_gates = {
+    name: ConcurrencyGate(limit, settings.ADMISSION_QUEUE_SIZE, settings.ADMISSION_QUEUE_TIMEOUT_SECONDS)
+    for name, limit in (
+        ("auth", settings.ADMISSION_AUTH_CONCURRENCY),
+        ("read", settings.ADMISSION_READ_CONCURRENCY),
+        ("write", settings.ADMISSION_WRITE_CONCURRENCY),
+    )
+}
+registry.callback("admission_in_flight", "Requests holding an admission slot.", "gauge",
+                  lambda: {(name,): gate.active for name, gate in admission_gates.items()}, ("route_class",))
+registry.callback("admission_queued", "Requests waiting for an admission slot.", "gauge",
+                  lambda: {(name,): gate.queued for name, gate in admission_gates.items()}, ("route_class",))
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that sheds load before it reaches the threadpool and the DB pool.
+
+    Requests are split into auth, read and write classes, each with its own
+    concurrency cap (ADMISSION_*_CONCURRENCY). Up to ADMISSION_QUEUE_SIZE more wait
+    for a slot. Past that, or after ADMISSION_QUEUE_TIMEOUT_SECONDS in the queue, the
+    request gets 503 with Retry-After. A burst in one class then cannot take the
+    capacity of the others.
+    """
+
+    def __init__(self, app, gates: dict[str, ConcurrencyGate] | None = None):
+        self.app = app
+        self.gates = admission_gates if gates is None else gates
+
+    async def __call__(self, scope, receive, send):
+        name = route_class(scope) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        gate = self.gates[name]
+        rejected = await gate.acquire()
+        if rejected is not None:
+            requests_rejected_total.inc(route_class=name, reason=rejected)
+            logger.warning("Shed %s %s: %s requests %s", scope["method"], scope["path"], name, rejected)
+            response = JSONResponse(
+                {"detail": "Server is overloaded, retry later"}, status_code=503,
+                headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
+
+
+class UserRateLimiter:
+    """Per-user token buckets: ``rate`` requests per second with bursts of up to ``burst``.
+
+    Buckets of the least recently seen users are dropped past ``max_users``; a user
+    coming back after that long has a full bucket anyway, unless the cap is tiny.
+    """
+
+    def __init__(self, rate: float, burst: int, max_users: int = 100_000):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_users = max_users
+        # user id -> (tokens, last refill)
+        self._buckets: "OrderedDict[int, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, user_id: int) -> float:
+        """Spend one token; returns 0, or the seconds until one is available when there is none."""
+        if self.rate <= 0:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(user_id, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / self.rate
+            if not wait:
+                tokens -= 1
+            self._buckets[user_id] = (tokens, now)
+            if len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+user_rate_limiter = UserRateLimiter(settings.USER_RATE_LIMIT_PER_SECOND, settings.USER_RATE_LIMIT_BURST)
+
+
+def enforce_user_rate_limit(user_id: int) -> None:
+    """Raise 429 with Retry-After when the user has run out of request tokens."""
+    wait = user_rate_limiter.acquire(user_id)
+    if wait:
+        user_rate_limited_total.inc()
+        raise TooManyRequestsException(retry_after=math.ceil(wait))
@@ -1,7 +1,31 @@
-from fastapi import Query
+from fastapi import Depends, Query
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from src.auth.cache import UserSnapshot
+from src.auth.service import get_current_user
+from src.db.database import get_db
+from src.db.routing import RoutingSession
 
 
 class PaginationParams(BaseModel):
     limit: int = Query(default=100, ge=1, le=1000, description="Max results to return")
     offset: int = Query(default=0, ge=0, description="How many items to skip")
+    cursor: str | None = Query(
+        default=None,
+        description="Opaque cursor from a previous page's next_cursor/prev_cursor (replaces offset)",
+    )
+
+
+def get_read_db(
+        db: Session = Depends(get_db),
+        current_user: UserSnapshot = Depends(get_current_user),
+) -> Session:
+    """The request's session, with reads sent to a replica unless this user just wrote.
+
+    Only for routes that never write; ``current_user`` is resolved first so the
+    session knows whose read-your-writes window applies.
+    """
+    if isinstance(db, RoutingSession):
+        db.route_reads()
+    return db
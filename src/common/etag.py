@@ -0,0 +1,26 @@
+import hashlib
+
+from fastapi import Response
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the ``repr`` of ``parts``; equal parts give equal tags."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag``.
+
+    If-None-Match uses the weak comparison, so a ``W/`` prefix on either side is ignored.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
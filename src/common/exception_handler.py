@@ -6,7 +6,8 @@ from starlette.status import (
     HTTP_403_FORBIDDEN,
     HTTP_404_NOT_FOUND,
     HTTP_409_CONFLICT,
-    HTTP_422_UNPROCESSABLE_ENTITY, HTTP_500_INTERNAL_SERVER_ERROR,
+    HTTP_422_UNPROCESSABLE_ENTITY, HTTP_429_TOO_MANY_REQUESTS, HTTP_500_INTERNAL_SERVER_ERROR,
+    HTTP_503_SERVICE_UNAVAILABLE,
 )
 
 from src.common.exceptions import (
@@ -16,6 +17,8 @@ from src.common.exceptions import (
     DuplicateEntryException,
     UnauthorizedException,
     UnauthenticatedException,
+    TooManyRequestsException,
+    ServiceUnavailableException,
 )
 
 
@@ -24,42 +27,58 @@ def register_exception_handlers(app):
     async def not_found_exception_handler(request: Request, exc: NotFoundException):
         return JSONResponse(
             status_code=HTTP_404_NOT_FOUND,
-            content={"detail": str(exc)}
+            content={"detail": exc.detail}
         )
 
     @app.exception_handler(BadRequestException)
     async def bad_request_exception_handler(request: Request, exc: BadRequestException):
         return JSONResponse(
             status_code=HTTP_400_BAD_REQUEST,
-            content={"detail": str(exc)}
+            content={"detail": exc.detail}
         )
 
     @app.exception_handler(UnprocessableEntityException)
     async def unprocessable_entity_handler(request: Request, exc: UnprocessableEntityException):
         return JSONResponse(
             status_code=HTTP_422_UNPROCESSABLE_ENTITY,
-            content={"detail": str(exc)}
+            content={"detail": exc.detail}
         )
 
     @app.exception_handler(DuplicateEntryException)
     async def duplicate_entry_handler(request: Request, exc: DuplicateEntryException):
         return JSONResponse(
             status_code=HTTP_409_CONFLICT,
-            content={"detail": str(exc)}
+            content={"detail": exc.detail}
         )
 
     @app.exception_handler(UnauthorizedException)
     async def unauthorized_handler(request: Request, exc: UnauthorizedException):
         return JSONResponse(
             status_code=HTTP_403_FORBIDDEN,
-            content={"detail": str(exc)}
+            content={"detail": exc.detail}
         )
 
     @app.exception_handler(UnauthenticatedException)
     async def unauthenticated_handler(request: Request, exc: UnauthenticatedException):
         return JSONResponse(
             status_code=HTTP_401_UNAUTHORIZED,
-            content={"detail": str(exc)}
+            content={"detail": exc.detail}
+        )
+
+    @app.exception_handler(TooManyRequestsException)
+    async def too_many_requests_handler(request: Request, exc: TooManyRequestsException):
+        return JSONResponse(
+            status_code=HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": exc.detail},
+            headers=exc.headers,
+        )
+
+    @app.exception_handler(ServiceUnavailableException)
+    async def service_unavailable_handler(request: Request, exc: ServiceUnavailableException):
+        return JSONResponse(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": exc.detail},
+            headers=exc.headers,
         )
 
     @app.exception_handler(Exception)
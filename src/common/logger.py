@@ -1,31 +1,280 @@
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Callable, Optional
 
 from src.config import settings
 
 LOG_FILE_PATH = settings.LOG_FILE_PATH
 os.makedirs(os.path.dirname(LOG_FILE_PATH), exist_ok=True)
 
+LOG_FORMAT = "[%(asctime)s] [%(levelname)s] [%(name)s]: %(message)s"
+LOG_LINE_PATTERN = re.compile(r"^\[[^\]]*\] \[(?P<level>[A-Z]+)\] \[(?P<name>[^\]]+)\]: ")
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the most recent log records in memory for the healthcheck endpoint."""
+
+    def __init__(self, capacity: int):
+        super().__init__()
+        self._records: deque = deque(maxlen=capacity)
+        self._buffer_lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            entry = {
+                "timestamp": datetime.utcfromtimestamp(record.created).isoformat(),
+                "level": record.levelname,
+                "levelno": record.levelno,
+                "logger": record.name,
+                "message": record.getMessage(),
+            }
+        except Exception:
+            self.handleError(record)
+            return
+        with self._buffer_lock:
+            self._records.append(entry)
+
+    def records(self, limit: int, level: Optional[str] = None, logger_name: Optional[str] = None) -> list[dict]:
+        """Newest-last records at or above ``level`` from ``logger_name`` or its children."""
+        min_level = logging.getLevelName(level.upper()) if level else logging.NOTSET
+        with self._buffer_lock:
+            snapshot = list(self._records)
+
+        selected = []
+        for entry in reversed(snapshot):
+            if entry["levelno"] < min_level:
+                continue
+            if logger_name and not _logger_matches(entry["logger"], logger_name):
+                continue
+            selected.append({key: value for key, value in entry.items() if key != "levelno"})
+            if len(selected) == limit:
+                break
+        selected.reverse()
+        return selected
+
+
+def _logger_matches(name: str, prefix: str) -> bool:
+    return name == prefix or name.startswith(prefix + ".")
+
+
+ring_buffer_handler = (
+    RingBufferHandler(settings.LOG_RING_BUFFER_SIZE) if settings.LOG_RING_BUFFER_SIZE > 0 else None
+)
+
+
+def log_line_filter(level: Optional[str] = None, logger_name: Optional[str] = None) -> Optional[Callable[[str], bool]]:
+    """Predicate matching formatted log file lines by minimum level and logger name."""
+    if not level and not logger_name:
+        return None
+    min_level = logging.getLevelName(level.upper()) if level else logging.NOTSET
+
+    def matches(line: str) -> bool:
+        match = LOG_LINE_PATTERN.match(line)
+        if not match:
+            return False
+        line_level = logging.getLevelName(match.group("level"))
+        if isinstance(line_level, int) and line_level < min_level:
+            return False
+        return not logger_name or _logger_matches(match.group("name"), logger_name)
+
+    return matches
+
+
+def tail_lines(path: str, limit: int, predicate: Optional[Callable[[str], bool]] = None,
+               block_size: int = 8192) -> list[str]:
+    """Last ``limit`` lines of ``path`` (optionally only those matching ``predicate``).
+
+    Reads backwards from the end in fixed-size blocks, so the cost depends on how much
+    of the tail is scanned rather than on the size of the file.
+    """
+    def keep(raw: bytes) -> bool:
+        line = raw.decode("utf-8", errors="replace") + "\n"
+        if predicate is None or predicate(line):
+            lines.append(line)
+        return len(lines) >= limit
+
+    lines: list[str] = []
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        partial = b""
+        at_end = True
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            parts = (f.read(step) + partial).split(b"\n")
+            if at_end and parts[-1] == b"":
+                parts.pop()
+            at_end = False
+            # parts[0] may continue in the previous block; every later part is a whole line.
+            partial = parts[0]
+            if any(keep(raw) for raw in reversed(parts[1:])):
+                break
+        else:
+            if partial:
+                keep(partial)
+
+    lines.reverse()
+    return lines
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Hands records to the background writer through a bounded queue.
+
+    With the ``drop`` policy a full queue discards the record (and counts it) instead
+    of stalling the request thread; ``block`` waits for the writer to catch up.
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop"):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.policy == "block" and log_writer.running:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class CallSiteRateLimitFilter(logging.Filter):
+    """Rate limits and samples high-volume records per call site (file and line).
+
+    Each call site gets a token bucket refilled at ``rate`` records per second; records
+    it admits are then kept with probability ``sample_rate``. Only records at or below
+    ``max_level`` are considered, so warnings and errors always get through. The next
+    record kept from a call site notes how many were suppressed before it.
+    """
+
+    def __init__(self, rate: float, sample_rate: float = 1.0, max_level: int = logging.INFO):
+        super().__init__()
+        self.rate = rate
+        self.sample_rate = sample_rate
+        self.max_level = max_level
+        self._sites: dict[tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        if self.rate <= 0 and self.sample_rate >= 1:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            # [tokens, last refill, suppressed since the last kept record]
+            site = self._sites.setdefault((record.pathname, record.lineno), [self.rate, now, 0])
+            if self.rate > 0:
+                site[0] = min(self.rate, site[0] + (now - site[1]) * self.rate)
+                site[1] = now
+                if site[0] < 1:
+                    site[2] += 1
+                    return False
+                site[0] -= 1
+            if self.sample_rate < 1 and random.random() >= self.sample_rate:
+                site[2] += 1
+                return False
+            suppressed, site[2] = site[2], 0
+
+        if suppressed:
+            record.msg = f"{record.msg} [{suppressed} similar messages suppressed]"
+        return True
+
+
+class _BoundedQueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # The base class uses put_nowait, which fails on a full bounded queue; wait for
+        # the writer thread to make room instead.
+        self.queue.put(self._sentinel)
+
+
+class LogWriter:
+    """Owns the single background thread that formats and writes queued records."""
+
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler):
+        self.queue = log_queue
+        self._listener = _BoundedQueueListener(log_queue, *handlers, respect_handler_level=True)
+        self._lock = threading.Lock()
+        self.running = False
+
+    def start(self):
+        with self._lock:
+            if not self.running:
+                self._listener.start()
+                self.running = True
+
+    def stop(self):
+        """Flush everything already queued and stop the writer thread."""
+        with self._lock:
+            if self.running:
+                self.running = False
+                self._listener.stop()
+
+
+def _build_output_handlers() -> list[logging.Handler]:
+    formatter = logging.Formatter(LOG_FORMAT)
+    stream_handler = logging.StreamHandler()
+    file_handler = RotatingFileHandler(
+        LOG_FILE_PATH,
+        maxBytes=204800,
+        backupCount=0,
+    )
+    handlers = [stream_handler, file_handler]
+    if ring_buffer_handler is not None:
+        handlers.append(ring_buffer_handler)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+_log_queue: queue.Queue = queue.Queue(maxsize=max(settings.LOG_QUEUE_SIZE, 0))
+log_writer = LogWriter(_log_queue, *_build_output_handlers())
+queue_handler = BoundedQueueHandler(_log_queue, policy=settings.LOG_QUEUE_FULL_POLICY)
+queue_handler.addFilter(CallSiteRateLimitFilter(settings.LOG_INFO_RATE_LIMIT, settings.LOG_INFO_SAMPLE_RATE))
+_volume_filter = CallSiteRateLimitFilter(settings.LOG_VOLUME_RATE_LIMIT, settings.LOG_VOLUME_SAMPLE_RATE)
+atexit.register(log_writer.stop)
+
+
+def log_queue_stats() -> dict:
+    return {
+        "queued": _log_queue.qsize(),
+        "maxsize": _log_queue.maxsize,
+        "dropped": queue_handler.dropped,
+    }
+
 
 def get_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
 
     if not logger.hasHandlers():
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            "[%(asctime)s] [%(levelname)s] [%(name)s]: %(message)s"
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        file_handler = RotatingFileHandler(
-            LOG_FILE_PATH,
-            maxBytes=204800,
-            backupCount=0,
-        )
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-
+        # Request threads only enqueue; file writes and rotation happen on the writer thread.
+        log_writer.start()
+        logger.addHandler(queue_handler)
         logger.setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
 
     return logger
+
+
+def get_volume_logger(name: str) -> logging.Logger:
+    """Logger for the high-volume INFO lines of module ``name``, rate limited per call site.
+
+    Records go to the ``<name>.volume`` child and propagate to the module's handler, so
+    only call sites that opt in are thinned; audit lines on the module logger are not.
+    """
+    get_logger(name)
+    logger = logging.getLogger(f"{name}.volume")
+    if _volume_filter not in logger.filters:
+        logger.addFilter(_volume_filter)
+    return logger
@@ -1,15 +1,38 @@
+import base64
+import binascii
+import json
 from typing import Generic, TypeVar, List, Optional
 
 from pydantic.generics import GenericModel
 
+from src.common.exceptions import BadRequestException
+
 T = TypeVar("T")
 
 
 class PaginatedResponse(GenericModel, Generic[T]):
-    total: int
-    page: int
+    total: Optional[int]
+    page: Optional[int]
     page_size: int
     next_page: Optional[int]
     previous_page: Optional[int]
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
     items: List[T]
+
+
+def encode_cursor(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise BadRequestException("Invalid cursor")
+    if not isinstance(payload, dict):
+        raise BadRequestException("Invalid cursor")
+    return payload
@@ -0,0 +1,259 @@
+import asyncio
+import cProfile
+import io
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi.routing import APIRoute
+
+from src.common.cache import TTLCache
+from src.common.logger import get_logger
+from src.config import settings
+
+logger = get_logger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_MODES = {"timing", "cprofile", "tracemalloc"}
+# Identical statements issued at least this often in one request are reported as N+1 suspects.
+N_PLUS_ONE_THRESHOLD = 3
+# Individual statements listed in Server-Timing; the rest only count towards "db".
+MAX_STATEMENT_TIMINGS = 10
+REPORT_LINES = 25
+
+# cProfile/tracemalloc summaries, fetched by id from GET /debug/profiles/{report_id}.
+profile_reports = TTLCache(maxsize=100, ttl=600)
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+class RequestProfile:
+    """Phase and SQL timings collected for one profiled request."""
+
+    def __init__(self, mode: str, authorized: bool):
+        self.mode = mode
+        self.authorized = authorized
+        self.started = time.perf_counter()
+        self.phases: list[tuple[str, float]] = []
+        self.statements: list[tuple[str, float]] = []
+        self.report_id = uuid.uuid4().hex if mode != "timing" else None
+        self.profiler: Optional[cProfile.Profile] = None
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.endpoint_finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.phases.append((name, seconds))
+
+    def add_statement(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            self.statements.append((statement, seconds))
+
+    def n_plus_one_suspects(self) -> list[tuple[str, int]]:
+        counts = Counter(statement for statement, _ in self.statements)
+        return [(statement, count) for statement, count in counts.most_common() if count >= N_PLUS_ONE_THRESHOLD]
+
+    def server_timing(self) -> str:
+        entries = [_timing_entry(name, seconds) for name, seconds in self.phases]
+        if self.statements:
+            db_seconds = sum(seconds for _, seconds in self.statements)
+            entries.append(_timing_entry("db", db_seconds, f"{len(self.statements)} queries"))
+            for index, (statement, seconds) in enumerate(self.statements[:MAX_STATEMENT_TIMINGS], start=1):
+                entries.append(_timing_entry(f"sql-{index}", seconds, statement))
+        entries.append(_timing_entry("total", time.perf_counter() - self.started))
+        return ", ".join(entries)
+
+
+def _describe(text: str, limit: int = 80) -> str:
+    text = re.sub(r"\s+", " ", text).strip().replace('"', "'").replace("\\", "/")
+    text = text.encode("ascii", "replace").decode("ascii")
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _timing_entry(name: str, seconds: float, description: Optional[str] = None) -> str:
+    entry = f"{name};dur={seconds * 1000:.3f}"
+    if description:
+        entry += f';desc="{_describe(description)}"'
+    return entry
+
+
+@contextmanager
+def profile_phase(name: str):
+    """Time a block as a named phase of the current request, if it is being profiled."""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_phase(name, time.perf_counter() - start)
+
+
+def record_statement(statement: str, seconds: float) -> None:
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.add_statement(statement, seconds)
+
+
+def authorize_profile(principal) -> None:
+    """Let admins see the profile of a request they opted into."""
+    profile = _current_profile.get()
+    if profile is not None and principal.is_admin:
+        profile.authorized = True
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute that times the endpoint body and the serialization after it."""
+
+    def get_route_handler(self):
+        endpoint = self.dependant.call
+        if getattr(endpoint, "__profiled__", False):
+            return super().get_route_handler()
+
+        if asyncio.iscoroutinefunction(endpoint):
+            async def timed_endpoint(*args, **kwargs):
+                with _endpoint_timer():
+                    return await endpoint(*args, **kwargs)
+        else:
+            def timed_endpoint(*args, **kwargs):
+                with _endpoint_timer():
+                    return endpoint(*args, **kwargs)
+        timed_endpoint.__profiled__ = True
+        self.dependant.call = timed_endpoint
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request):
+            response = await handler(request)
+            profile = _current_profile.get()
+            if profile is not None and profile.endpoint_finished is not None:
+                profile.add_phase("serialize", time.perf_counter() - profile.endpoint_finished)
+            return response
+
+        return profiled_handler
+
+
+@contextmanager
+def _endpoint_timer():
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    profile.add_phase("deps", time.perf_counter() - profile.started)
+    # The dependencies have authenticated the caller by now. The expensive modes only
+    # run for requests that may see their report, so anyone else gets plain timings.
+    if profile.authorized and profile.mode == "cprofile":
+        # cProfile only sees the calling thread, so enable it where the endpoint runs.
+        profile.profiler = cProfile.Profile()
+        profile.profiler.enable()
+    elif profile.authorized and profile.mode == "tracemalloc" and profile.snapshot is None:
+        profile.snapshot = _start_tracemalloc()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if profile.profiler is not None:
+            profile.profiler.disable()
+        profile.endpoint_finished = time.perf_counter()
+        profile.add_phase("endpoint", profile.endpoint_finished - start)
+
+
+def _start_tracemalloc() -> tracemalloc.Snapshot:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+    return tracemalloc.take_snapshot()
+
+
+def _stop_tracemalloc(before: tracemalloc.Snapshot) -> str:
+    global _tracemalloc_users, _tracemalloc_owned
+    after = tracemalloc.take_snapshot()
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        # Leave tracing on if it was enabled outside the profiler (e.g. PYTHONTRACEMALLOC).
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+    stats = after.compare_to(before, "lineno")
+    return "\n".join(str(stat) for stat in stats[:REPORT_LINES])
+
+
+def _cprofile_report(profiler: cProfile.Profile) -> str:
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(REPORT_LINES)
+    return out.getvalue()
+
+
+def _requested_mode(scope) -> Optional[str]:
+    for name, value in scope.get("headers", ()):
+        if name == PROFILE_HEADER.encode():
+            value = value.decode("latin-1").strip().lower()
+            if value in PROFILE_MODES:
+                return value
+            return "timing" if value in ("1", "true", "on") else None
+    return None
+
+
+class ProfilingMiddleware:
+    """Opt-in per-request profiling, requested with an ``X-Profile`` header.
+
+    ``X-Profile: 1`` (or ``timing``) returns phase and SQL timings as ``Server-Timing``
+    headers; ``cprofile`` and ``tracemalloc`` also store a summary retrievable through
+    ``X-Profile-Report``, and only start once the caller is known to be allowed to see
+    it. With ``PROFILING=admin`` results are only returned when the caller
+    authenticates as an admin; ``all`` returns them to anyone.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        mode = _requested_mode(scope) if scope["type"] == "http" and settings.PROFILING != "off" else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(mode, authorized=settings.PROFILING == "all")
+        token = _current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and profile.authorized:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", profile.server_timing().encode("latin-1")))
+                suspects = profile.n_plus_one_suspects()
+                if suspects:
+                    statement, count = suspects[0]
+                    headers.append((b"x-profile-n-plus-one", f'{count}x "{_describe(statement)}"'.encode("latin-1")))
+                    logger.warning("Possible N+1 on %s %s: %s", scope["method"], scope["path"],
+                                   "; ".join(f"{count}x {_describe(s)}" for s, count in suspects))
+                if profile.profiler is not None or profile.snapshot is not None:
+                    headers.append((b"x-profile-report", profile.report_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
+            report = None
+            if profile.snapshot is not None:
+                report = _stop_tracemalloc(profile.snapshot)
+            elif profile.profiler is not None:
+                report = _cprofile_report(profile.profiler)
+            if report is not None:
+                profile_reports.set(profile.report_id, report)
@@ -1,26 +1,60 @@
 import os
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
-from src.auth.service import get_current_admin_user
-from src.auth.models import User
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from src.auth.cache import UserSnapshot, principal_cache
+from src.common.exceptions import NotFoundException
+from src.common.logger import log_line_filter, log_queue_stats, ring_buffer_handler, tail_lines
+from src.common.metrics import CONTENT_TYPE, registry
+from src.common.profiling import ProfiledRoute, profile_reports
 from src.config import settings
 from datetime import datetime
 
+if settings.ASYNC_DB:
+    from src.auth.async_service import get_current_admin_user
+else:
+    from src.auth.service import get_current_admin_user
+
 LOG_FILE = settings.LOG_FILE_PATH
 
-router = APIRouter(tags=["Monitoring"])
+router = APIRouter(tags=["Monitoring"], route_class=ProfiledRoute)
 
 
 @router.get("/healthcheck")
-def healthcheck(admin: User = Depends(get_current_admin_user)):
-    if not os.path.exists(LOG_FILE):
-        return JSONResponse(content={"message": "Log file not found"}, status_code=404)
-
-    with open(LOG_FILE, "r") as f:
-        logs = f.readlines()[-20:]
+def healthcheck(
+        lines: int = Query(default=20, ge=1, le=1000, description="Number of log entries to return"),
+        source: str = Query(default="file", pattern="^(file|memory)$"),
+        level: str | None = Query(default=None, pattern="^(DEBUG|INFO|WARNING|ERROR|CRITICAL)$",
+                                  description="Minimum log level"),
+        logger: str | None = Query(default=None, description="Logger name, including its children"),
+        admin: UserSnapshot = Depends(get_current_admin_user),
+):
+    if source == "memory":
+        if ring_buffer_handler is None:
+            return JSONResponse(content={"message": "In-memory log buffer is disabled"}, status_code=404)
+        logs = ring_buffer_handler.records(lines, level=level, logger_name=logger)
+    else:
+        if not os.path.exists(LOG_FILE):
+            return JSONResponse(content={"message": "Log file not found"}, status_code=404)
+        logs = tail_lines(LOG_FILE, lines, predicate=log_line_filter(level, logger))
 
     return {
         "timestamp": datetime.utcnow().isoformat(),
         "status": "ok",
-        "log_entries": logs
+        "log_entries": logs,
+        "auth_cache": principal_cache.stats(),
+        "log_queue": log_queue_stats(),
     }
+
+
+@router.get("/debug/profiles/{report_id}", response_class=PlainTextResponse)
+def profile_report(report_id: str, admin: UserSnapshot = Depends(get_current_admin_user)):
+    report = profile_reports.get(report_id)
+    if report is None:
+        raise NotFoundException("Profile report not found or expired")
+    return report
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    # Unauthenticated like other scrape targets; restrict access at the network edge.
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -10,7 +12,69 @@ class Settings(BaseSettings):
     HASH_ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     LOG_FILE_PATH: str = "logs/api.log"
+    # Recent log records kept in memory for /healthcheck; 0 disables the buffer.
+    LOG_RING_BUFFER_SIZE: int = 1000
+    # Records waiting for the background log writer (0 = unbounded); when full, "drop" or "block".
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_QUEUE_FULL_POLICY: Literal["drop", "block"] = "drop"
+    # Per call site cap on INFO-and-below records per second (0 = unlimited), and the
+    # fraction of those records kept once the cap allows them. Applies to every logger.
+    LOG_INFO_RATE_LIMIT: float = 0
+    LOG_INFO_SAMPLE_RATE: float = 1.0
+    # The same cap for call sites that log through get_volume_logger, such as one line per read.
+    LOG_VOLUME_RATE_LIMIT: float = 50
+    LOG_VOLUME_SAMPLE_RATE: float = 1.0
     SECRET_KEY: str
+    # Comma-separated read replica URLs for read-only routes; empty reads from the primary.
+    REPLICA_DATABASE_URLS: str = ""
+    REPLICA_HEALTH_CHECK_SECONDS: int = 10
+    # How long a user's reads stay on the primary after they write (replication lag budget).
+    # The window is kept per process: with several workers, a read landing on a worker
+    # other than the one that took the write may go to a lagging replica. Run one worker
+    # per host, or leave REPLICA_DATABASE_URLS empty, where read-your-writes is required.
+    READ_YOUR_WRITES_SECONDS: int = 5
+    # Serve requests from async handlers on an async engine instead of the threadpool.
+    ASYNC_DB: bool = False
+    # Who may profile requests with the X-Profile header: "off", "admin" or "all".
+    PROFILING: Literal["off", "admin", "all"] = "admin"
+    # Authenticated principals cached per bearer token; size 0 disables the cache. Users are
+    # only changed outside the API (create_admin.py, SQL), so the TTL bounds how long a
+    # revoked admin flag or deleted user keeps working on a cached token.
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    # bcrypt work factor; existing hashes below it are upgraded on login.
+    BCRYPT_ROUNDS: int = 12
+    # Password hashing process pool size (defaults to CPU count, 0 hashes inline).
+    PASSWORD_HASH_WORKERS: int | None = None
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    # Max tasks created by one POST /tasks/batch or /tasks/{id}/fork?count=N.
+    TASK_BATCH_MAX_SIZE: int = 1000
+    # Filtered listing totals cached per user; writes by that user invalidate them.
+    TASK_COUNT_CACHE_SIZE: int = 10000
+    TASK_COUNT_CACHE_TTL_SECONDS: int = 30
+    # Live task events: events a subscriber may fall behind before it is dropped,
+    # events kept for clients resuming with Last-Event-ID, and the idle keep-alive interval.
+    TASK_EVENTS_BUFFER_SIZE: int = 1000
+    TASK_EVENTS_HISTORY_SIZE: int = 10000
+    TASK_EVENTS_HEARTBEAT_SECONDS: float = 15
+    # Longest timeout GET /tasks/{id}/wait accepts.
+    TASK_WAIT_MAX_SECONDS: float = 300
+    # Admission control: concurrent requests per route class (0 = unlimited), requests that
+    # may queue for a slot and for how long before getting 503, and the Retry-After sent.
+    ADMISSION_AUTH_CONCURRENCY: int = 8
+    ADMISSION_READ_CONCURRENCY: int = 32
+    ADMISSION_WRITE_CONCURRENCY: int = 16
+    ADMISSION_QUEUE_SIZE: int = 100
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 5
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    # Per-user token bucket: sustained requests per second (0 = unlimited) and burst size.
+    USER_RATE_LIMIT_PER_SECOND: float = 50
+    USER_RATE_LIMIT_BURST: int = 100
+    # Finished tasks move to tasks_archive this many days after they end, in batches, every
+    # interval seconds (0 leaves archiving to the archive-tasks command).
+    TASK_ARCHIVE_AFTER_DAYS: float = 30
+    TASK_ARCHIVE_BATCH_SIZE: int = 1000
+    TASK_ARCHIVE_INTERVAL_SECONDS: float = 3600
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,154 @@
+import csv
+import io
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional
+
+from sqlalchemy import Table, func, insert, select
+from sqlalchemy.engine import Connection, Engine
+
+from src.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+CHUNK_SIZE = 10_000
+
+# Connection-level SQLite settings traded for load speed; restored afterwards.
+# Durability is irrelevant mid-load: a failed load is rolled back and rerun.
+SQLITE_LOAD_PRAGMAS = {
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+    "cache_size": "-262144",
+}
+
+
+@dataclass
+class LoadStats:
+    table: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def next_id(engine: Engine, table: Table) -> int:
+    """First id after the rows already in ``table``, for loads that assign their own ids."""
+    with engine.connect() as conn:
+        return (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+@contextmanager
+def _sqlite_relaxed(conn: Connection):
+    # synchronous cannot change inside a transaction, so these wrap the load's transaction.
+    previous = {name: conn.exec_driver_sql(f"PRAGMA {name}").scalar() for name in SQLITE_LOAD_PRAGMAS}
+    for name, value in SQLITE_LOAD_PRAGMAS.items():
+        conn.exec_driver_sql(f"PRAGMA {name} = {value}")
+    conn.commit()
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            conn.exec_driver_sql(f"PRAGMA {name} = {value}")
+        conn.commit()
+
+
+def _copy_value(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return value
+
+
+def _copy_chunk(conn: Connection, table: Table, columns: list[str], chunk: list[dict]) -> None:
+    # Apply the column types' bind processing (e.g. Enum -> stored name) before COPY.
+    processors = [table.c[name].type.bind_processor(conn.dialect) for name in columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in chunk:
+        values = []
+        for name, process in zip(columns, processors):
+            value = row.get(name)
+            if process is not None and value is not None:
+                value = process(value)
+            values.append(_copy_value(value))
+        writer.writerow(values)
+    buffer.seek(0)
+    # Unquoted empty fields are NULL in COPY's CSV format; csv.writer writes None that way.
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def bulk_load(
+        engine: Engine,
+        table: Table,
+        rows: Iterable[dict],
+        chunk_size: int = CHUNK_SIZE,
+        progress: Optional[Callable[[int], None]] = None,
+        conn_hook: Optional[Callable[[Connection], object]] = None,
+) -> LoadStats:
+    """Insert ``rows`` into ``table`` in one transaction, as fast as the dialect allows.
+
+    Postgres streams each chunk through ``COPY ... FROM STDIN``; other databases use
+    batched ``executemany`` (with relaxed pragmas on SQLite). The columns loaded are
+    those of the first row. ``progress`` receives the running row count after each
+    chunk, and ``conn_hook`` may return a context manager wrapped around the load.
+    """
+    started = time.perf_counter()
+    loaded = 0
+    is_postgres = engine.dialect.name == "postgresql"
+    with engine.connect() as conn:
+        relaxed = _sqlite_relaxed(conn) if engine.dialect.name == "sqlite" else nullcontext()
+        with relaxed:
+            try:
+                with conn_hook(conn) if conn_hook is not None else nullcontext():
+                    columns: Optional[list[str]] = None
+                    for chunk in _chunks(rows, chunk_size):
+                        if columns is None:
+                            columns = [column.name for column in table.columns if column.name in chunk[0]]
+                        if is_postgres:
+                            _copy_chunk(conn, table, columns, chunk)
+                        else:
+                            conn.execute(insert(table), chunk)
+                        loaded += len(chunk)
+                        if progress is not None:
+                            progress(loaded)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+    stats = LoadStats(table.name, loaded, time.perf_counter() - started)
+    logger.info("Loaded %s rows into %s in %.1fs (%.0f rows/s)",
+                stats.rows, stats.table, stats.seconds, stats.rows_per_second)
+    return stats
+
+
+def finish_load(engine: Engine, tables: Iterable[Table]) -> None:
+    """Resync id sequences after explicit-id loads and refresh planner statistics."""
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            for table in tables:
+                conn.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+                )
+        conn.exec_driver_sql("ANALYZE")
@@ -1,17 +1,60 @@
 from src.config import settings
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from src.db.instrumentation import instrument_engine
+from src.db.routing import RecentWriters, ReplicaSet, RoutingSession
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
 engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+instrument_engine(engine, "primary")
+
+replica_engines = [create_engine(url.strip()) for url in settings.REPLICA_DATABASE_URLS.split(",") if url.strip()]
+for index, replica_engine in enumerate(replica_engines):
+    instrument_engine(replica_engine, f"replica{index}")
+replicas = ReplicaSet(replica_engines, check_interval=settings.REPLICA_HEALTH_CHECK_SECONDS)
+recent_writers = RecentWriters(window=settings.READ_YOUR_WRITES_SECONDS)
+
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine,
+    class_=RoutingSession, replicas=replicas, recent_writers=recent_writers,
+)
 
 Base = declarative_base()
 
 
+def to_async_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for '{parsed.get_backend_name()}'")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+# The async stack is only built when enabled so its drivers stay optional.
+async_engine = create_async_engine(to_async_url(settings.DATABASE_URL)) if settings.ASYNC_DB else None
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine, "async")
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,85 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.common.metrics import DB_BUCKETS, registry
+from src.common.profiling import record_statement
+
+STATEMENT_TYPES = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK"}
+
+db_queries_total = registry.counter(
+    "db_queries_total", "SQL statements executed.", ("engine", "statement")
+)
+db_query_duration_seconds = registry.histogram(
+    "db_query_duration_seconds", "Time spent executing SQL statements.", ("engine", "statement"), DB_BUCKETS
+)
+db_pool_checkout_wait_seconds = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", ("engine",), DB_BUCKETS
+)
+
+# Engines rather than their pools: dispose() swaps engine.pool, so read it at scrape time.
+_engines: dict[str, Engine] = {}
+
+
+def _pool_usage() -> dict:
+    samples = {}
+    for name, engine in _engines.items():
+        pool = engine.pool
+        for state, method in (("checked_out", "checkedout"), ("idle", "checkedin"), ("overflow", "overflow")):
+            read = getattr(pool, method, None)
+            if read is not None:
+                samples[(name, state)] = read()
+    return samples
+
+
+registry.callback(
+    "db_pool_connections", "Pooled connections by state.", "gauge", _pool_usage, ("engine", "state")
+)
+
+
+def _statement_type(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in STATEMENT_TYPES else "OTHER"
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Record query counts and durations, pool checkout wait and pool usage for ``engine``.
+
+    For an ``AsyncEngine`` pass its ``sync_engine``.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        statement_type = _statement_type(statement)
+        db_queries_total.inc(engine=name, statement=statement_type)
+        db_query_duration_seconds.observe(elapsed, engine=name, statement=statement_type)
+        record_statement(statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _discard_timer(context):
+        # after_cursor_execute does not fire for failed statements.
+        if context.connection is not None:
+            timers = context.connection.info.get("query_start_time")
+            if timers:
+                timers.pop()
+
+    # The pool has no "before checkout" event, so time Engine.raw_connection(), the public
+    # entry point every Connection goes through. It reads engine.pool on each call, so the
+    # timing keeps working after dispose() replaces the pool.
+    raw_connection = engine.raw_connection
+
+    def timed_raw_connection():
+        start = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            db_pool_checkout_wait_seconds.observe(time.perf_counter() - start, engine=name)
+
+    engine.raw_connection = timed_raw_connection
+    _engines[name] = engine
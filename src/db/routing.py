@@ -0,0 +1,158 @@
+import itertools
+import threading
+import time
+from typing import Hashable, Optional
+
+from sqlalchemy import Delete, Insert, Update, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from src.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ReplicaSet:
+    """Round-robin over read replicas, skipping ones that fail their health check.
+
+    A replica is pinged at most once per ``check_interval`` seconds when it is next due
+    to be picked, and is taken out of rotation immediately when a query on it fails
+    with a connection error.
+    """
+
+    def __init__(self, engines: list[Engine], check_interval: float = 10):
+        self.engines = engines
+        self.check_interval = check_interval
+        self._healthy = {id(engine): True for engine in engines}
+        # Never checked: every replica is pinged before it first serves a read.
+        self._checked_at = {id(engine): float("-inf") for engine in engines}
+        self._cycle = itertools.cycle(engines) if engines else None
+        self._lock = threading.Lock()
+        for engine in engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def _on_error(self, context):
+        # No connection means connecting itself failed.
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+    def mark_down(self, engine: Engine) -> None:
+        if self._healthy.get(id(engine)):
+            logger.warning("Replica %s is unavailable; routing its reads elsewhere", engine.url.host or engine.url)
+        self._healthy[id(engine)] = False
+        self._checked_at[id(engine)] = time.monotonic()
+
+    def _check(self, engine: Engine) -> bool:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            healthy = True
+        except DBAPIError:
+            healthy = False
+        if healthy and not self._healthy[id(engine)]:
+            logger.info("Replica %s is back in rotation", engine.url.host or engine.url)
+        self._healthy[id(engine)] = healthy
+        self._checked_at[id(engine)] = time.monotonic()
+        return healthy
+
+    def choose(self) -> Optional[Engine]:
+        """Next healthy replica, or None when every replica is down."""
+        for _ in range(len(self.engines)):
+            with self._lock:
+                engine = next(self._cycle)
+            if time.monotonic() - self._checked_at[id(engine)] >= self.check_interval:
+                if self._check(engine):
+                    return engine
+            elif self._healthy[id(engine)]:
+                return engine
+        return None
+
+    def dispose(self) -> None:
+        for engine in self.engines:
+            engine.dispose()
+
+
+class RecentWriters:
+    """Remembers who wrote recently, so their reads stay on the primary until replicas catch up.
+
+    The record lives in this process only. Another worker does not know about the write,
+    so read-your-writes holds only for reads served by the worker that took it.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._writes: dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, key: Hashable) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._writes[key] = now
+            if len(self._writes) > 10_000:
+                # Drop expired entries rather than letting the map grow without bound.
+                self._writes = {k: t for k, t in self._writes.items() if now - t < self.window}
+
+    def is_recent(self, key: Hashable) -> bool:
+        written_at = self._writes.get(key)
+        return written_at is not None and time.monotonic() - written_at < self.window
+
+    def clear(self) -> None:
+        with self._lock:
+            self._writes.clear()
+
+
+class RoutingSession(Session):
+    """Session that sends reads to a replica once marked ``read_only``.
+
+    Everything else (flushes, INSERT/UPDATE/DELETE statements and sessions not marked
+    read-only) uses the primary bind. A read-only session sticks to the replica it
+    first picked, so one request sees a single consistent snapshot. Commits that
+    wrote something record ``info["user_id"]`` in ``recent_writers``, which keeps
+    that user's reads on the primary for the read-your-writes window.
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None,
+                 recent_writers: Optional[RecentWriters] = None, read_only: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.recent_writers = recent_writers
+        self.read_only = read_only
+        self._replica: Optional[Engine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.read_only and self.replicas and not self._flushing \
+                and not isinstance(clause, (Insert, Update, Delete)):
+            if self._replica is None:
+                self._replica = self.replicas.choose()
+            if self._replica is not None:
+                return self._replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+    def route_reads(self) -> None:
+        """Serve this session's reads from a replica, unless its user wrote recently."""
+        user_id = self.info.get("user_id")
+        recent = self.recent_writers is not None and user_id is not None and self.recent_writers.is_recent(user_id)
+        self.read_only = not recent
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _flagged_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _flagged_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_writer(session):
+    if session.info.pop("wrote", False) and session.recent_writers is not None:
+        user_id = session.info.get("user_id")
+        if user_id is not None:
+            session.recent_writers.mark(user_id)
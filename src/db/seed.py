@@ -0,0 +1,194 @@
+import csv
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+from sqlalchemy.engine import Engine
+
+from src.auth.hashing import hash_password
+from src.auth.models import User
+from src.db.bulk import LoadStats, bulk_load
+from src.task.constants import TaskStatus
+from src.task.models import Task
+from src.task.search import sqlite_fts_suspended
+
+COMMANDS = ("backup", "build", "compile", "cron", "deploy", "index", "make", "render", "rsync", "sync")
+DEFAULT_STATUS_MIX = {TaskStatus.RUNNING: 0.6, TaskStatus.COMPLETED: 0.3, TaskStatus.KILLED: 0.1}
+# Recently created tasks per user that a synthetic fork may pick as its parent.
+FORK_WINDOW = 100
+
+
+def read_records(path: Path) -> Iterator[dict]:
+    """Rows from an NDJSON (.ndjson/.jsonl) or CSV file; empty CSV fields become None."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.suffix.lower() == ".csv":
+            for record in csv.DictReader(f):
+                yield {key: value if value != "" else None for key, value in record.items()}
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _datetime(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def _status(value) -> TaskStatus:
+    if value is None:
+        return TaskStatus.RUNNING
+    return value if isinstance(value, TaskStatus) else TaskStatus(value.lower())
+
+
+def _int(value) -> Optional[int]:
+    return None if value is None else int(value)
+
+
+def user_rows(records: Iterable[dict], first_id: int) -> Iterator[dict]:
+    """Users from ``records`` with either ``hashed_password`` or a plain ``password``.
+
+    Plain passwords are hashed once per distinct value, so loads sharing a password stay fast.
+    """
+    hashes: dict[str, str] = {}
+    for offset, record in enumerate(records):
+        hashed = record.get("hashed_password")
+        if hashed is None:
+            password = record["password"]
+            if password not in hashes:
+                hashes[password] = hash_password(password)
+            hashed = hashes[password]
+        is_admin = record.get("is_admin")
+        yield {
+            "id": _int(record.get("id")) or first_id + offset,
+            "username": record["username"],
+            "hashed_password": hashed,
+            "is_admin": is_admin in (True, "true", "True", "1", 1),
+        }
+
+
+def task_rows(records: Iterable[dict], first_id: int, user_ids: dict[str, int],
+              default_user_id: Optional[int] = None, keep_ids: bool = True) -> Iterator[dict]:
+    """Tasks from ``records`` shaped like the /tasks/export output.
+
+    The owner comes from ``user_id``, a ``username`` looked up in ``user_ids``, or
+    ``default_user_id``. With ``keep_ids`` off, tasks are renumbered from ``first_id``
+    and parent ids are remapped, which requires parents to precede their children.
+    """
+    remapped: dict[int, int] = {}
+    for offset, record in enumerate(records):
+        user_id = _int(record.get("user_id"))
+        if user_id is None and record.get("username") is not None:
+            user_id = user_ids[record["username"]]
+        if user_id is None:
+            user_id = default_user_id
+        if user_id is None:
+            raise ValueError(f"Row {offset + 1} has no owner; pass a default owner")
+
+        source_id = _int(record.get("id"))
+        parent_id = _int(record.get("parent_id"))
+        if keep_ids and source_id is not None:
+            task_id = source_id
+        else:
+            task_id = first_id + offset
+            if source_id is not None:
+                remapped[source_id] = task_id
+            if parent_id is not None:
+                if parent_id not in remapped:
+                    raise ValueError(f"Parent {parent_id} of row {offset + 1} must appear before it")
+                parent_id = remapped[parent_id]
+
+        created_at = _datetime(record.get("created_at")) or datetime.utcnow()
+        ended_at = _datetime(record.get("ended_at"))
+        yield {
+            "id": task_id,
+            "name": record["name"],
+            "status": _status(record.get("status")),
+            "created_at": created_at,
+            "started_at": _datetime(record.get("started_at")) or created_at,
+            "ended_at": ended_at,
+            "updated_at": _datetime(record.get("updated_at")) or ended_at or created_at,
+            "parent_id": parent_id,
+            "user_id": user_id,
+        }
+
+
+def generate_users(count: int, first_id: int, password: str, prefix: str = "user") -> Iterator[dict]:
+    hashed = hash_password(password)
+    for offset in range(count):
+        yield {
+            "id": first_id + offset,
+            "username": f"{prefix}{first_id + offset}",
+            "hashed_password": hashed,
+            "is_admin": False,
+        }
+
+
+def generate_tasks(
+        count: int,
+        first_id: int,
+        user_ids: list[int],
+        fork_ratio: float = 0.3,
+        max_depth: int = 8,
+        status_mix: Optional[dict[TaskStatus, float]] = None,
+        span: timedelta = timedelta(days=30),
+        seed: int = 0,
+) -> Iterator[dict]:
+    """Deterministic synthetic tasks spread over ``span`` ending now.
+
+    A ``fork_ratio`` share of tasks fork one of their owner's recent tasks, building
+    trees up to ``max_depth`` deep; statuses follow ``status_mix`` and finished tasks
+    get an ``ended_at`` after their start.
+    """
+    rng = random.Random(seed)
+    mix = status_mix or DEFAULT_STATUS_MIX
+    statuses, weights = list(mix), list(mix.values())
+    start = datetime.utcnow() - span
+    step = span / max(count, 1)
+    recent: dict[int, list[tuple[int, int]]] = {user_id: [] for user_id in user_ids}
+
+    for offset in range(count):
+        task_id = first_id + offset
+        user_id = rng.choice(user_ids)
+        candidates = recent[user_id]
+        parent_id, depth = None, 0
+        if candidates and rng.random() < fork_ratio:
+            parent_id, parent_depth = rng.choice(candidates)
+            if parent_depth + 1 < max_depth:
+                depth = parent_depth + 1
+            else:
+                parent_id = None
+
+        created_at = start + step * offset
+        status = rng.choices(statuses, weights)[0]
+        ended_at = None
+        if status != TaskStatus.RUNNING:
+            ended_at = created_at + timedelta(seconds=rng.randint(1, 3600))
+
+        candidates.append((task_id, depth))
+        if len(candidates) > FORK_WINDOW:
+            candidates.pop(0)
+
+        yield {
+            "id": task_id,
+            "name": f"{rng.choice(COMMANDS)} {task_id}",
+            "status": status,
+            "created_at": created_at,
+            "started_at": created_at,
+            "ended_at": ended_at,
+            "updated_at": ended_at or created_at,
+            "parent_id": parent_id,
+            "user_id": user_id,
+        }
+
+
+def load_users(engine: Engine, rows: Iterable[dict], progress: Optional[Callable[[int], None]] = None) -> LoadStats:
+    return bulk_load(engine, User.__table__, rows, progress=progress)
+
+
+def load_tasks(engine: Engine, rows: Iterable[dict], progress: Optional[Callable[[int], None]] = None) -> LoadStats:
+    hook = sqlite_fts_suspended if engine.dialect.name == "sqlite" else None
+    return bulk_load(engine, Task.__table__, rows, progress=progress, conn_hook=hook)
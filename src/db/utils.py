@@ -14,5 +14,5 @@ def check_db_connection():
         return True
     except OperationalError as e:
         logger.error("Could not connect to the database.")
-        logger.debug(f"Detailed DB error: {e}")
+        logger.debug("Detailed DB error: %s", e)
         return False
@@ -1,16 +1,33 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
 
-from src.auth.router import router as auth_router
+from src.auth.hashing import hasher
+from src.common.admission import AdmissionMiddleware
 from src.common.exception_handler import register_exception_handlers
-from src.common.logger import get_logger
+from src.common.logger import get_logger, log_writer
+from src.common.metrics import MetricsMiddleware
+from src.common.profiling import ProfilingMiddleware
 from src.common.router import router as common_router
+from src.config import settings
 from src.db.utils import check_db_connection
-from src.task.router import router as task_router
+from src.task.archive import archive_periodically
+
+if settings.ASYNC_DB:
+    from src.auth.async_router import router as auth_router
+    from src.task.async_router import router as task_router
+else:
+    from src.auth.router import router as auth_router
+    from src.task.router import router as task_router
 
 app = FastAPI(title="Unix-Inspired Task Manager")
 
 register_exception_handlers(app)
+app.add_middleware(ProfilingMiddleware)
+# Inside MetricsMiddleware, so shed requests still show up as 503s in http_requests_total.
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth_router)
 app.include_router(task_router)
@@ -26,6 +43,29 @@ def verify_db_on_startup():
         raise RuntimeError("Database is not available.")
 
 
+@app.on_event("startup")
+async def start_task_archiver():
+    if settings.TASK_ARCHIVE_INTERVAL_SECONDS > 0:
+        app.state.task_archiver = asyncio.create_task(archive_periodically(settings.TASK_ARCHIVE_INTERVAL_SECONDS))
+
+
+@app.on_event("shutdown")
+def stop_task_archiver():
+    archiver = getattr(app.state, "task_archiver", None)
+    if archiver is not None:
+        archiver.cancel()
+
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    hasher.shutdown()
+
+
+@app.on_event("shutdown")
+def flush_logs():
+    log_writer.stop()
+
+
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.orm import Session, aliased
+
+from src.common.logger import get_logger
+from src.common.metrics import registry
+from src.config import settings
+from src.db.database import SessionLocal
+from .constants import TaskStatus
+from .counts import invalidate_task_counts
+from .models import Task, TaskArchive
+from .service import bump_task_generation
+
+logger = get_logger(__name__)
+
+ARCHIVED_COLUMNS = tuple(column.name for column in Task.__table__.columns)
+
+tasks_archived_total = registry.counter("tasks_archived_total", "Finished tasks moved to tasks_archive.")
+
+
+def _archivable(cutoff: datetime):
+    """WHERE clauses for live tasks that may move: finished before ``cutoff``, with no live children."""
+    child = aliased(Task)
+    return (
+        Task.status != TaskStatus.RUNNING,
+        Task.ended_at < cutoff,
+        # Children keep a foreign key to their parent, so a tree moves leaves first.
+        ~exists().where(child.parent_id == Task.id),
+        # SQLite numbers new rows max(id) + 1, so moving the newest row would let its id be reused.
+        Task.id < select(func.max(Task.id)).scalar_subquery(),
+    )
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int, after_id: int = 0) -> tuple[int, int | None]:
+    """Move up to ``batch_size`` archivable tasks with ids above ``after_id``, in one transaction.
+
+    Returns how many moved and the last id considered, or None when none were left. The
+    rows to copy come back from the DELETE itself, so two archivers racing over the same
+    batch cannot copy a task twice.
+    """
+    ids = db.scalars(
+        select(Task.id).where(Task.id > after_id, *_archivable(cutoff)).order_by(Task.id).limit(batch_size)
+    ).all()
+    if not ids:
+        return 0, None
+    rows = db.execute(
+        delete(Task)
+        .where(Task.id.in_(ids), *_archivable(cutoff))
+        .returning(*(getattr(Task, name) for name in ARCHIVED_COLUMNS))
+        .execution_options(synchronize_session=False)
+    ).all()
+    user_ids = {row.user_id for row in rows}
+    if rows:
+        db.execute(insert(TaskArchive), [row._asdict() for row in rows])
+        bump_task_generation(db, user_ids)
+    db.commit()
+    for user_id in user_ids:
+        invalidate_task_counts(user_id)
+    tasks_archived_total.inc(len(rows))
+    return len(rows), ids[-1]
+
+
+def archive_finished_tasks(db: Session, older_than: timedelta, batch_size: int) -> int:
+    """Move tasks that finished more than ``older_than`` ago to tasks_archive; returns how many moved.
+
+    One pass walks the table once in id order, committing a batch at a time, so locks
+    stay short and a listing never sees a task in both tables. Parents come before their
+    forks in id order, so a parent whose children moved in this pass moves on the next.
+    """
+    cutoff = datetime.utcnow() - older_than
+    moved = after_id = 0
+    while True:
+        count, after_id = archive_batch(db, cutoff, batch_size, after_id)
+        if after_id is None:
+            break
+        moved += count
+    if moved:
+        logger.info("Archived %s tasks that finished before %s", moved, cutoff.isoformat())
+    return moved
+
+
+def _archive_with_settings() -> int:
+    with SessionLocal() as db:
+        return archive_finished_tasks(
+            db, timedelta(days=settings.TASK_ARCHIVE_AFTER_DAYS), settings.TASK_ARCHIVE_BATCH_SIZE
+        )
+
+
+async def archive_periodically(interval: float) -> None:
+    """Background job: archive finished tasks every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(_archive_with_settings)
+        except Exception:
+            logger.exception("Archiving finished tasks failed; retrying in %s seconds", interval)
@@ -0,0 +1,154 @@
+from typing import AsyncIterator, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import service
+from .constants import TaskStatus
+from .encoding import csv_header, encode_rows
+from .models import Task
+from .schemas import TaskCreate, TaskResponse, TaskKillSummary, PaginatedTaskResponse
+from .tree import TaskTreeEncoder, build_tree_query
+from ..auth.cache import UserSnapshot
+
+# Query logic lives in src.task.service; these wrappers run it on an AsyncSession
+# through run_sync, so the event loop awaits the driver instead of a thread.
+
+
+async def get_tasks(
+    db: AsyncSession,
+    current_user: UserSnapshot,
+    parent_id: int | None = None,
+    status: TaskStatus | None = None,
+    search: str | None = None,
+    limit: int = 10,
+    offset: int = 0,
+    sort_by: str = "created_at",
+    order: str = "desc",
+    cursor: str | None = None,
+    total_mode: str = "exact",
+    include_archived: bool = False,
+) -> PaginatedTaskResponse:
+    return await db.run_sync(
+        service.get_tasks,
+        current_user=current_user,
+        parent_id=parent_id,
+        status=status,
+        search=search,
+        limit=limit,
+        offset=offset,
+        sort_by=sort_by,
+        order=order,
+        cursor=cursor,
+        total_mode=total_mode,
+        include_archived=include_archived,
+    )
+
+
+async def get_tasks_json(db: AsyncSession, current_user: UserSnapshot, **params) -> bytes:
+    return await db.run_sync(service.get_tasks_json, current_user=current_user, **params)
+
+
+async def get_tasks_etag(db: AsyncSession, current_user: UserSnapshot, **params) -> str:
+    return await db.run_sync(service.get_tasks_etag, current_user=current_user, **params)
+
+
+async def get_task_etag(task_id: int, db: AsyncSession, current_user: UserSnapshot,
+                        fields: str | None = None) -> str | None:
+    return await db.run_sync(lambda session: service.get_task_etag(task_id, session, current_user, fields))
+
+
+async def get_finished_task_json(task_id: int, db: AsyncSession, current_user: UserSnapshot,
+                                 fields: str | None = None) -> bytes | None:
+    return await db.run_sync(lambda session: service.get_finished_task_json(task_id, session, current_user, fields))
+
+
+async def get_task_json(task_id: int, db: AsyncSession, current_user: UserSnapshot,
+                        fields: str | None = None) -> tuple[bytes, str]:
+    return await db.run_sync(lambda session: service.get_task_json(task_id, session, current_user, fields))
+
+
+async def get_task(task_id: int, db: AsyncSession, current_user: UserSnapshot):
+    return await db.run_sync(lambda session: service.get_task(task_id, session, current_user))
+
+
+async def create_task(db: AsyncSession, task: TaskCreate, current_user: UserSnapshot):
+    return await db.run_sync(service.create_task, task, current_user)
+
+
+async def create_tasks(db: AsyncSession, tasks: List[TaskCreate], current_user: UserSnapshot) -> List[TaskResponse]:
+    return await db.run_sync(service.create_tasks, tasks, current_user)
+
+
+async def fork_task(parent_id: int, db: AsyncSession, current_user: UserSnapshot) -> Task:
+    return await db.run_sync(lambda session: service.fork_task(parent_id, session, current_user))
+
+
+async def kill_task(task_id: int, db: AsyncSession, current_user: UserSnapshot):
+    return await db.run_sync(lambda session: service.kill_task(task_id, session, current_user))
+
+
+async def fork_tasks(parent_id: int, count: int, db: AsyncSession, current_user: UserSnapshot) -> List[TaskResponse]:
+    return await db.run_sync(lambda session: service.fork_tasks(parent_id, count, session, current_user))
+
+
+async def kill_task_tree(task_id: int, db: AsyncSession, current_user: UserSnapshot) -> TaskKillSummary:
+    return await db.run_sync(lambda session: service.kill_task_tree(task_id, session, current_user))
+
+
+async def stream_task_tree(
+    task_id: int,
+    db: AsyncSession,
+    current_user: UserSnapshot,
+    max_depth: int | None = None,
+    fmt: str = "json",
+    include_counts: bool = False,
+) -> AsyncIterator[str]:
+    root = await get_task(task_id, db, current_user)
+    statement = build_tree_query(
+        task_id, current_user.id, max_depth, db.get_bind().dialect.name, type(root)
+    ).execution_options(
+        yield_per=service.STREAM_BATCH_SIZE
+    )
+
+    async def generate() -> AsyncIterator[str]:
+        # get_async_db closes the request session before the body streams, so the
+        # generator reads through a session of its own on the same engine.
+        encoder = TaskTreeEncoder(fmt, include_counts)
+        async with AsyncSession(db.bind) as stream_db:
+            async for row in await stream_db.stream(statement):
+                for chunk in encoder.feed(row):
+                    yield chunk
+        for chunk in encoder.finish():
+            yield chunk
+
+    return generate()
+
+
+async def export_tasks(
+    db: AsyncSession,
+    current_user: UserSnapshot,
+    parent_id: int | None = None,
+    status: TaskStatus | None = None,
+    search: str | None = None,
+    sort_by: str = "created_at",
+    order: str = "desc",
+    fmt: str = "ndjson",
+    fields: str | None = None,
+) -> AsyncIterator[str]:
+    selected = service.resolve_fields(fields)
+    query = await db.run_sync(
+        lambda session: service.build_export_query(
+            session, current_user, parent_id, status, search, sort_by, order, selected
+        )
+    )
+    statement = query.statement.execution_options(yield_per=service.STREAM_BATCH_SIZE)
+
+    async def generate() -> AsyncIterator[str]:
+        if fmt == "csv":
+            yield csv_header(selected)
+        # See stream_task_tree: the rows are read through the generator's own session.
+        async with AsyncSession(db.bind) as stream_db:
+            async for rows in (await stream_db.stream(statement)).partitions():
+                yield encode_rows(rows, fmt, selected)
+
+    return generate()
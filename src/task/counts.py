@@ -0,0 +1,84 @@
+import json
+import threading
+from typing import Hashable
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from src.common.cache import TTLCache
+from src.common.metrics import register_cache_metrics
+from src.config import settings
+
+# Filtered task counts keyed by (user_id, generation, *filters). Writes bump the
+# user's generation instead of scanning the cache; orphaned entries age out via LRU.
+# Both the cache and the generations are per process: with several workers, a write
+# only invalidates the worker that served it, and the others keep serving the old
+# total for up to TASK_COUNT_CACHE_TTL_SECONDS.
+task_count_cache = TTLCache(
+    maxsize=settings.TASK_COUNT_CACHE_SIZE,
+    ttl=settings.TASK_COUNT_CACHE_TTL_SECONDS,
+)
+register_cache_metrics("task_count_cache", task_count_cache.stats, "task count cache")
+_generations: dict[int, int] = {}
+_generations_lock = threading.Lock()
+
+
+def invalidate_task_counts(user_id: int) -> None:
+    with _generations_lock:
+        _generations[user_id] = _generations.get(user_id, 0) + 1
+
+
+def _cache_key(user_id: int, filters: tuple) -> Hashable:
+    return (user_id, _generations.get(user_id, 0)) + filters
+
+
+class _Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a statement, keeping its bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _planner_estimate(query: Query) -> int | None:
+    """Row estimate from the Postgres planner, without executing the query."""
+    session = query.session
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+    # Search text stays a bind parameter rather than being inlined into the SQL.
+    plan = session.execute(_Explain(query.statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_tasks(query: Query, user_id: int, filters: tuple, mode: str = "exact") -> int | None:
+    """Total for a filtered task query.
+
+    ``exact`` counts (served from the cache when fresh), ``estimate`` prefers a cached
+    count and otherwise asks the planner (falling back to counting off Postgres), and
+    ``none`` skips counting entirely.
+    """
+    if mode == "none":
+        return None
+
+    key = _cache_key(user_id, filters)
+    cached = task_count_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if mode == "estimate":
+        estimate = _planner_estimate(query)
+        if estimate is not None:
+            return estimate
+
+    total = query.count()
+    task_count_cache.set(key, total)
+    return total
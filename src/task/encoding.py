@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+
+import orjson
+
+from src.task.schemas import PaginatedTaskResponse
+
+TASK_FIELDS = ("id", "name", "status", "created_at", "started_at", "ended_at", "parent_id")
+PAGE_FIELDS = tuple(PaginatedTaskResponse.model_fields)
+
+
+def to_jsonable(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def task_row_to_dict(row, fields=TASK_FIELDS) -> dict:
+    """Plain dict for a Task entity or column row, shaped like TaskResponse."""
+    return {field: to_jsonable(getattr(row, field)) for field in fields}
+
+
+def csv_header(fields=TASK_FIELDS) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(fields)
+    return buffer.getvalue()
+
+
+def encode_rows(rows, fmt: str, fields=TASK_FIELDS) -> str:
+    """Encode one batch of rows as a single NDJSON or CSV chunk."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if value is None else value for value in task_row_to_dict(row, fields).values()])
+        return buffer.getvalue()
+    return "".join(json.dumps(task_row_to_dict(row, fields)) + "\n" for row in rows)
+
+
+def encode_page(page: dict, fields=TASK_FIELDS) -> bytes:
+    """JSON for a page of task rows, matching FastAPI's PaginatedTaskResponse output byte for byte.
+
+    orjson writes datetimes and enums the way pydantic's JSON mode does, and compact
+    UTF-8 like Starlette's JSONResponse; keys follow the schema's field order.
+    """
+    body = {key: page[key] for key in PAGE_FIELDS}
+    body["items"] = [dict(zip(fields, row)) for row in page["items"]]
+    return orjson.dumps(body)
+
+
+def encode_task(row, fields=TASK_FIELDS) -> bytes:
+    """JSON for one task row, in the same format as ``encode_page`` items."""
+    return orjson.dumps(dict(zip(fields, row)))
@@ -0,0 +1,202 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from src.common.logger import get_logger
+from src.common.metrics import registry
+from src.config import settings
+
+logger = get_logger(__name__)
+
+task_event_evictions_total = registry.counter(
+    "task_event_evictions_total", "Event subscribers dropped for falling too far behind."
+)
+
+
+@dataclass(frozen=True)
+class TaskEvent:
+    # None for control events that are not part of the resumable sequence.
+    id: Optional[int]
+    # "created", "forked" or "killed" carry the task; "batch_created", "batch_forked" and
+    # "tree_killed" summarise a bulk write in one event; "reset" tells a resuming client
+    # it missed events.
+    type: str
+    user_id: int
+    data: dict = field(default_factory=dict)
+
+    def sse(self) -> str:
+        event_id = f"id: {self.id}\n" if self.id is not None else ""
+        return f"{event_id}event: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+    def message(self) -> dict:
+        return {"id": self.id, "type": self.type, "data": self.data}
+
+
+class SlowConsumer(Exception):
+    """The subscriber fell a full buffer behind and was dropped."""
+
+
+class Subscription:
+    """One client's event feed, bound to the event loop it subscribed from.
+
+    The broker hands events over with ``call_soon_threadsafe``, so publishers may run
+    in worker threads. A subscription whose buffer is full when an event arrives is
+    evicted rather than allowed to grow or to hold up other subscribers.
+    """
+
+    def __init__(self, broker: "TaskEventBroker", user_id: int, buffer_size: int):
+        self.broker = broker
+        self.user_id = user_id
+        self.buffer_size = buffer_size
+        self.loop = asyncio.get_running_loop()
+        self.evicted = False
+        self._events: deque[TaskEvent] = deque()
+        self._ready = asyncio.Event()
+
+    def _push(self, event: TaskEvent) -> None:
+        if self.evicted:
+            return
+        if len(self._events) >= self.buffer_size:
+            self.evicted = True
+            self.broker.unsubscribe(self)
+            task_event_evictions_total.inc()
+            logger.warning("Dropped a slow task event subscriber for user %s", self.user_id)
+        else:
+            self._events.append(event)
+        self._ready.set()
+
+    async def get(self, timeout: float) -> Optional[TaskEvent]:
+        """Next event, or None after ``timeout`` seconds without one; raises SlowConsumer once evicted."""
+        if not self._events and not self.evicted:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.evicted:
+            raise SlowConsumer()
+        return self._events.popleft()
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class TaskEventBroker:
+    """In-process pub/sub of task lifecycle events, fanned out per user.
+
+    Events get increasing ids and the last ``history_size`` of them are kept, so a
+    client reconnecting with the last id it saw receives what it missed. Ids start
+    from the clock, so an id from before a restart is recognised as a gap. Each
+    process has its own broker: with several workers, a client only sees events
+    from writes served by the worker it is connected to.
+    """
+
+    def __init__(self, buffer_size: int, history_size: int):
+        self.buffer_size = buffer_size
+        self._history: deque[TaskEvent] = deque(maxlen=history_size)
+        self._next_id = time.time_ns() // 1000
+        # Highest id pushed out of the history; resuming from before it may miss events.
+        self._dropped_through = self._next_id - 1
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, event_type: str, user_id: int, data: dict) -> TaskEvent:
+        with self._lock:
+            event = TaskEvent(self._next_id, event_type, user_id, data)
+            self._next_id += 1
+            if self._history.maxlen and len(self._history) == self._history.maxlen:
+                self._dropped_through = self._history[0].id
+            self._history.append(event)
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._push, event)
+            except RuntimeError:
+                # Its event loop has closed under it.
+                self.unsubscribe(subscription)
+        return event
+
+    def subscribe(self, user_id: int, last_event_id: Optional[int] = None) -> Subscription:
+        """Subscribe from the running event loop, replaying events after ``last_event_id``."""
+        subscription = Subscription(self, user_id, self.buffer_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+            if last_event_id is not None:
+                if self._dropped_through <= last_event_id < self._next_id:
+                    subscription._events.extend(
+                        event for event in self._history if event.id > last_event_id and event.user_id == user_id
+                    )
+                else:
+                    subscription._events.append(TaskEvent(None, "reset", user_id))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+task_events = TaskEventBroker(settings.TASK_EVENTS_BUFFER_SIZE, settings.TASK_EVENTS_HISTORY_SIZE)
+registry.callback("task_event_subscribers", "Open task event streams.", "gauge",
+                  lambda: {(): task_events.subscriber_count()})
+
+
+async def sse_stream(user_id: int, last_event_id: Optional[int]) -> AsyncIterator[str]:
+    """Server-Sent Events for ``user_id``, with keep-alive comments while idle."""
+    # Subscribe on first iteration, so a response that never starts leaves nothing behind.
+    subscription = task_events.subscribe(user_id, last_event_id)
+    try:
+        while True:
+            try:
+                event = await subscription.get(settings.TASK_EVENTS_HEARTBEAT_SECONDS)
+            except SlowConsumer:
+                yield "event: evicted\ndata: {}\n\n"
+                return
+            yield event.sse() if event is not None else ": keep-alive\n\n"
+    finally:
+        subscription.close()
+
+
+async def serve_websocket(websocket: WebSocket, user_id: int, last_event_id: Optional[int]) -> None:
+    """Send ``user_id``'s events as JSON messages until the client disconnects or falls behind."""
+    await websocket.accept()
+    subscription = task_events.subscribe(user_id, last_event_id)
+
+    async def send_events():
+        while True:
+            event = await subscription.get(settings.TASK_EVENTS_HEARTBEAT_SECONDS)
+            if event is not None:
+                await websocket.send_json(event.message())
+
+    async def wait_for_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    sender = asyncio.create_task(send_events())
+    receiver = asyncio.create_task(wait_for_disconnect())
+    try:
+        done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        sender.cancel()
+        receiver.cancel()
+        subscription.close()
+    if sender in done:
+        error = sender.exception()
+        if isinstance(error, SlowConsumer):
+            # 1013 "try again later": the client reconnects with the last id it received.
+            await websocket.close(code=1013)
+        elif error is not None and not isinstance(error, WebSocketDisconnect):
+            raise error
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy import Enum as SqlEnum
 from sqlalchemy.orm import relationship
 
@@ -19,9 +19,58 @@ class Task(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     started_at = Column(DateTime, default=datetime.utcnow, nullable=True)
     ended_at = Column(DateTime, nullable=True)
+    # Bumped by every write to the row (status changes included); backs the task ETags.
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
 
     parent_id = Column(Integer, ForeignKey("tasks.id"), nullable=True)
     children = relationship("Task", remote_side=[id], backref="parent")
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     owner = relationship("User", backref="tasks")
+
+
+# Composite indexes matching the get_tasks filter/sort shapes; keep in sync with
+# alembic revision 3c9a1f2e7b10.
+Index("ix_tasks_user_id_created_at", Task.user_id, Task.created_at.desc(), Task.id.desc())
+Index("ix_tasks_user_id_status_created_at", Task.user_id, Task.status, Task.created_at.desc(), Task.id.desc())
+Index("ix_tasks_user_id_ended_at", Task.user_id, Task.ended_at, Task.id)
+Index("ix_tasks_user_id_name", Task.user_id, Task.name, Task.id)
+Index("ix_tasks_user_id_status", Task.user_id, Task.status, Task.id)
+Index("ix_tasks_user_id_parent_id", Task.user_id, Task.parent_id)
+Index(
+    "ix_tasks_name_trgm", Task.name,
+    postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
+
+
+class TaskArchive(Base):
+    """Finished tasks moved out of ``tasks`` by the archiver (src.task.archive).
+
+    Same columns and ids as ``tasks``, so a task reads the same after it moves.
+    Archived rows never change again. parent_id has no foreign key because the
+    parent may still be live: children are always archived before their parents.
+    """
+    __tablename__ = "tasks_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String, nullable=False)
+    status = Column(SqlEnum(TaskStatus), nullable=False)
+
+    created_at = Column(DateTime)
+    started_at = Column(DateTime, nullable=True)
+    ended_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+
+    parent_id = Column(Integer, nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+
+# Keep in sync with alembic revision 9b2f6d4e8a13.
+Index("ix_tasks_archive_user_id_created_at", TaskArchive.user_id, TaskArchive.created_at.desc(), TaskArchive.id.desc())
+Index("ix_tasks_archive_user_id_status_created_at", TaskArchive.user_id, TaskArchive.status,
+      TaskArchive.created_at.desc(), TaskArchive.id.desc())
+Index("ix_tasks_archive_user_id_parent_id", TaskArchive.user_id, TaskArchive.parent_id)
+Index(
+    "ix_tasks_archive_name_trgm", TaskArchive.name,
+    postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
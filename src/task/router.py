@@ -1,18 +1,28 @@
-from fastapi import APIRouter, Depends, Query
+from typing import List, Union
+
+from fastapi import APIRouter, Depends, Header, Query, Response, WebSocket
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from src.auth.models import User
+from src.auth.cache import UserSnapshot
 from src.auth.service import get_current_user
+from src.common.etag import etag_matches, not_modified
+from src.common.profiling import ProfiledRoute
+from src.config import settings
 from src.db.database import get_db
 from .constants import TaskStatus
-from .schemas import TaskCreate, TaskResponse, PaginatedTaskResponse
+from .events import serve_websocket, sse_stream
+from .schemas import TaskCreate, TaskResponse, TaskKillSummary, PaginatedTaskResponse
 from .service import (
-    create_task, get_tasks, fork_task as fork_existing_task_logic,
-    kill_task, get_task
+    create_task, create_tasks, export_tasks, get_tasks_json, fork_task as fork_existing_task_logic,
+    fork_tasks, kill_task, kill_task_tree, get_finished_task_json, get_task_etag, get_task_json, get_tasks_etag,
+    stream_task_tree
 )
-from ..common.dependencies import PaginationParams
+from .waiters import task_waiters
+from ..common.dependencies import PaginationParams, get_read_db
 
-router = APIRouter(prefix="/tasks", tags=["Tasks"])
+router = APIRouter(prefix="/tasks", tags=["Tasks"], route_class=ProfiledRoute)
 
 
 @router.get("", response_model=PaginatedTaskResponse)
@@ -22,38 +32,181 @@ def list_tasks(
         search: str | None = Query(default=None),
         sort_by: str = Query(default="created_at"),
         order: str = Query(default="desc", pattern="^(asc|desc)$"),
+        total: str = Query(
+            default="exact", pattern="^(exact|estimate|none)$",
+            description="exact counts (cached), estimate uses planner statistics, none skips counting",
+        ),
         pagination: PaginationParams = Depends(),
-        db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        fields: str | None = Query(default=None, description="Comma-separated task fields to return, e.g. id,status"),
+        include_archived: bool = Query(default=False, description="Also list finished tasks moved to the archive"),
+        if_none_match: str | None = Header(default=None),
+        db: Session = Depends(get_read_db),
+        current_user: UserSnapshot = Depends(get_current_user)
 ):
-    return get_tasks(
-        db,
-        current_user=current_user,
+    params = dict(
         parent_id=parent,
         status=status,
         search=search,
         limit=pagination.limit,
         offset=pagination.offset,
         sort_by=sort_by,
-        order=order
+        order=order,
+        cursor=pagination.cursor,
+        total_mode=total,
+        fields=fields,
+        include_archived=include_archived,
+    )
+    etag = get_tasks_etag(db, current_user=current_user, **params)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    content = get_tasks_json(db, current_user=current_user, **params)
+    return Response(content, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/export")
+def export_task_list(
+        parent: int | None = Query(default=None),
+        status: TaskStatus | None = Query(default=None),
+        search: str | None = Query(default=None),
+        sort_by: str = Query(default="created_at"),
+        order: str = Query(default="desc", pattern="^(asc|desc)$"),
+        format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+        fields: str | None = Query(default=None, description="Comma-separated task fields to return, e.g. id,status"),
+        db: Session = Depends(get_read_db),
+        current_user: UserSnapshot = Depends(get_current_user)
+):
+    chunks = export_tasks(
+        db,
+        current_user=current_user,
+        parent_id=parent,
+        status=status,
+        search=search,
+        sort_by=sort_by,
+        order=order,
+        fmt=format,
+        fields=fields,
     )
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f"attachment; filename=tasks.{format}"}
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+@router.post("/batch", response_model=List[TaskResponse], status_code=201)
+def create_task_batch(tasks: List[TaskCreate], db: Session = Depends(get_db),
+                      current_user: UserSnapshot = Depends(get_current_user)):
+    return create_tasks(db, tasks, current_user)
+
+
+@router.get("/events")
+async def stream_task_events(
+        last_event_id: int | None = Header(default=None, alias="Last-Event-ID"),
+        current_user: UserSnapshot = Depends(get_current_user)
+):
+    """Server-Sent Events for the user's task creates, forks and kills.
+
+    Reconnecting clients send Last-Event-ID to receive the events they missed.
+    """
+    return StreamingResponse(
+        sse_stream(current_user.id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/events/ws")
+async def task_events_socket(
+        websocket: WebSocket,
+        last_event_id: int | None = Query(default=None),
+        db: Session = Depends(get_db),
+        current_user: UserSnapshot = Depends(get_current_user)
+):
+    # Authentication is done; don't hold a pooled connection for the socket's lifetime.
+    db.close()
+    await serve_websocket(websocket, current_user.id, last_event_id)
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
-def retrieve_task(task_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return get_task(task_id, db, current_user)
+def retrieve_task(
+        task_id: int,
+        fields: str | None = Query(default=None, description="Comma-separated task fields to return, e.g. id,status"),
+        if_none_match: str | None = Header(default=None),
+        db: Session = Depends(get_read_db),
+        current_user: UserSnapshot = Depends(get_current_user)
+):
+    if if_none_match:
+        etag = get_task_etag(task_id, db, current_user, fields)
+        if etag is not None and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    content, etag = get_task_json(task_id, db, current_user, fields)
+    return Response(content, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/{task_id}/wait", response_model=TaskResponse, responses={204: {"description": "Still running"}})
+async def wait_for_task(
+        task_id: int,
+        timeout: float = Query(default=30, ge=0, le=settings.TASK_WAIT_MAX_SECONDS, description="Seconds to wait"),
+        fields: str | None = Query(default=None, description="Comma-separated task fields to return, e.g. id,status"),
+        db: Session = Depends(get_db),
+        current_user: UserSnapshot = Depends(get_current_user)
+):
+    """Block until the task leaves RUNNING, like waitpid(2), then return it.
+
+    Answers 204 if it is still running after ``timeout`` seconds; call again to keep waiting.
+    """
+    # Read from the primary: a replica could still show the task running after the kill.
+    waiter = task_waiters.register(task_id, current_user.id)
+    try:
+        content = await run_in_threadpool(get_finished_task_json, task_id, db, current_user, fields)
+        if content is None and timeout:
+            # Don't hold a pooled connection while parked.
+            await run_in_threadpool(db.close)
+            await waiter.wait(timeout)
+            content = await run_in_threadpool(get_finished_task_json, task_id, db, current_user, fields)
+    finally:
+        task_waiters.discard(waiter)
+    if content is None:
+        return Response(status_code=204)
+    return Response(content, media_type="application/json")
+
+
+@router.get("/{task_id}/tree")
+def retrieve_task_tree(
+        task_id: int,
+        max_depth: int | None = Query(default=None, ge=0, description="Levels below the task to include"),
+        format: str = Query(default="json", pattern="^(json|ndjson)$"),
+        include_counts: bool = Query(default=False, description="Add descendant_count to every node"),
+        db: Session = Depends(get_read_db),
+        current_user: UserSnapshot = Depends(get_current_user)
+):
+    chunks = stream_task_tree(task_id, db, current_user, max_depth, format, include_counts)
+    media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+    return StreamingResponse(chunks, media_type=media_type)
 
 
 @router.post("", response_model=TaskResponse, status_code=201)
-def create_new_task(task: TaskCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def create_new_task(task: TaskCreate, db: Session = Depends(get_db), current_user: UserSnapshot = Depends(get_current_user)):
     return create_task(db, task, current_user)
 
 
-@router.post("/{task_id}/fork", response_model=TaskResponse, status_code=201)
-def fork_existing_task(task_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.post("/{task_id}/fork", response_model=Union[TaskResponse, List[TaskResponse]], status_code=201)
+def fork_existing_task(
+        task_id: int,
+        count: int | None = Query(default=None, ge=1, description="Fork N children at once; returns a list"),
+        db: Session = Depends(get_db),
+        current_user: UserSnapshot = Depends(get_current_user)
+):
+    if count is not None:
+        return fork_tasks(task_id, count, db, current_user)
     return fork_existing_task_logic(task_id, db, current_user)
 
 
-@router.delete("/{task_id}", response_model=TaskResponse)
-def delete_task(task_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.delete("/{task_id}", response_model=Union[TaskResponse, TaskKillSummary])
+def delete_task(
+        task_id: int,
+        recursive: bool = Query(default=False, description="Kill every running descendant as well"),
+        db: Session = Depends(get_db),
+        current_user: UserSnapshot = Depends(get_current_user)
+):
+    if recursive:
+        return kill_task_tree(task_id, db, current_user)
     return kill_task(task_id, db, current_user)
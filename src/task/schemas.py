@@ -24,5 +24,11 @@ class TaskResponse(BaseModel):
         from_attributes = True
 
 
+class TaskKillSummary(BaseModel):
+    task_id: int
+    killed: int
+    ended_at: datetime
+
+
 class PaginatedTaskResponse(PaginatedResponse[TaskResponse]):
     pass
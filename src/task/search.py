@@ -0,0 +1,98 @@
+from contextlib import contextmanager
+from pathlib import Path
+
+from alembic.script import ScriptDirectory
+from sqlalchemy import DDL, event, func, literal, literal_column, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Query
+
+from src.db.database import Base
+from src.task.models import Task
+
+# The SQLite trigram tokenizer only indexes terms of at least three characters.
+MIN_FTS_TERM_LENGTH = 3
+
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+# The migration that creates tasks_fts and its sync triggers holds the only copy of that DDL.
+SQLITE_FTS_REVISION = "8d4e2b6a1c57"
+
+
+def _create_sqlite_fts(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    migration = ScriptDirectory(str(ALEMBIC_DIR)).get_revision(SQLITE_FTS_REVISION).module
+    for statement in migration.SQLITE_FTS_DDL:
+        connection.exec_driver_sql(statement)
+
+
+# Keep the shadow table and triggers in step with metadata.create_all/drop_all,
+# so rows inserted by create_task, fork_task or bulk loads are indexed by the database.
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+event.listen(Task.__table__, "after_create", _create_sqlite_fts)
+event.listen(
+    Task.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"),
+)
+
+
+@contextmanager
+def sqlite_fts_suspended(conn: Connection):
+    """Drop the FTS sync triggers during a bulk load and rebuild the index once afterwards.
+
+    Rebuilding in one pass is far cheaper than updating the index row by row.
+    """
+    # The triggers are restored from their own stored definitions, whichever created them.
+    triggers = conn.exec_driver_sql(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'tasks' "
+        "AND name LIKE 'tasks_fts_%'"
+    ).all()
+    if not triggers:
+        yield
+        return
+    for name, _ in triggers:
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+    try:
+        yield
+    finally:
+        for _, sql in triggers:
+            conn.exec_driver_sql(sql)
+        conn.exec_driver_sql("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def apply_search(query: Query, term: str, source=Task):
+    """Restrict ``query`` to tasks whose name contains ``term``.
+
+    ``source`` is the entity the query selects from: Task, or an alias that also
+    covers archived tasks. Returns the filtered query and a relevance expression
+    where larger is better.
+    """
+    dialect = query.session.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        # ILIKE is served by the pg_trgm GIN indexes on tasks.name and tasks_archive.name.
+        query = query.filter(source.name.ilike(f"%{term}%"))
+        return query, func.word_similarity(term, source.name)
+
+    # tasks_fts only indexes live tasks, so listings that include the archive use LIKE.
+    if dialect == "sqlite" and len(term) >= MIN_FTS_TERM_LENGTH and source is Task:
+        matches = (
+            select(literal_column("rowid").label("id"), literal_column("rank").label("rank"))
+            .select_from(text("tasks_fts"))
+            .where(text("tasks_fts MATCH :fts_phrase").bindparams(fts_phrase=_fts_phrase(term)))
+            .subquery()
+        )
+        query = query.join(matches, matches.c.id == Task.id)
+        # bm25 ranks are negative, with the best match lowest.
+        return query, -matches.c.rank
+
+    query = query.filter(source.name.ilike(f"%{term}%"))
+    return query, literal(0)
@@ -1,89 +1,387 @@
 from datetime import datetime
-from sqlalchemy.orm import Session
+
+from typing import Iterator, List
+
+from sqlalchemy import and_, insert, literal, or_, select, tuple_, union_all, update
+from sqlalchemy.orm import Query, Session, aliased
 
 from .constants import TaskStatus
-from .models import Task
-from .schemas import TaskCreate, PaginatedTaskResponse
+from .models import Task, TaskArchive
+from .schemas import TaskCreate, TaskResponse, TaskKillSummary, PaginatedTaskResponse
+from .counts import count_tasks, invalidate_task_counts
+from .encoding import TASK_FIELDS, csv_header, encode_page, encode_rows, encode_task, task_row_to_dict
+from .events import task_events
+from .search import apply_search
+from .tree import TaskTreeEncoder, build_tree_query
+from .waiters import task_waiters
+from ..auth.cache import UserSnapshot
 from ..auth.models import User
+from ..common.etag import make_etag
 from ..common.exceptions import (
     NotFoundException,
     UnauthorizedException,
     BadRequestException,
     UnprocessableEntityException,
 )
-from ..common.logger import get_logger
+from ..common.logger import get_logger, get_volume_logger
+from ..common.pagination import encode_cursor, decode_cursor
+from ..common.profiling import profile_phase
+from ..config import settings
 
 logger = get_logger(__name__)
+# One line per read; thinned per call site under load (LOG_VOLUME_RATE_LIMIT).
+volume_logger = get_volume_logger(__name__)
 
 
-def get_tasks(
-    db: Session,
-    current_user: User,
+VALID_SORT_FIELDS = {"created_at", "ended_at", "name", "status"}
+RELEVANCE_SORT_FIELD = "relevance"
+STREAM_BATCH_SIZE = 1000
+
+
+def resolve_fields(fields: str | None) -> tuple[str, ...]:
+    """Fields named in a comma-separated ``fields`` parameter, in TASK_FIELDS order; all when None."""
+    if fields is None:
+        return TASK_FIELDS
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    if not requested or not requested <= set(TASK_FIELDS):
+        raise BadRequestException(f"Invalid fields '{fields}'. Must be among {', '.join(TASK_FIELDS)}")
+    return tuple(field for field in TASK_FIELDS if field in requested)
+
+
+def _task_columns(fields: tuple[str, ...], *internal: str, source=Task) -> list:
+    """Columns for ``fields``, then any ``internal`` ones the query needs but the client did not ask for.
+
+    Reads select plain column rows: no ORM identity map, relationship loading or unused columns.
+    """
+    names = fields + tuple(name for name in dict.fromkeys(internal) if name not in fields)
+    return [getattr(source, name) for name in names]
+
+
+def _listing_source(current_user: UserSnapshot, include_archived: bool, status: TaskStatus | None):
+    """Task, or an alias over the user's live and archived tasks when a listing asks for both.
+
+    Archived tasks are never running, so a listing of running tasks never reads the archive.
+    """
+    if not include_archived or status == TaskStatus.RUNNING:
+        return Task
+    names = [column.name for column in Task.__table__.columns]
+    rows = union_all(
+        select(*[getattr(Task, name) for name in names]).where(Task.user_id == current_user.id),
+        select(*[getattr(TaskArchive, name) for name in names]).where(TaskArchive.user_id == current_user.id),
+    ).subquery("all_tasks")
+    return aliased(Task, rows)
+
+
+def _cursor_value(task: Task, sort_by: str):
+    value = getattr(task, sort_by)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, TaskStatus):
+        return value.value
+    return value
+
+
+def _parse_cursor_value(sort_by: str, value):
+    if value is None:
+        return None
+    try:
+        if sort_by in ("created_at", "ended_at"):
+            return datetime.fromisoformat(value)
+        if sort_by == "status":
+            return TaskStatus(value)
+    except (TypeError, ValueError):
+        raise BadRequestException("Invalid cursor")
+    return value
+
+
+def _make_cursor(task: Task, sort_by: str, order: str, direction: str) -> str:
+    return encode_cursor({
+        "sort_by": sort_by,
+        "order": order,
+        "direction": direction,
+        "value": _cursor_value(task, sort_by),
+        "id": task.id,
+    })
+
+
+def _order_by(sort_by: str, descending: bool, source=Task):
+    # NULLs sort as the largest value in both directions (the Postgres default),
+    # so one ascending index can be scanned either way.
+    sort_column = getattr(source, sort_by)
+    if descending:
+        return sort_column.desc().nulls_first(), source.id.desc()
+    return sort_column.asc().nulls_last(), source.id.asc()
+
+
+def _seek_after(sort_by: str, value, last_id: int, descending: bool, source=Task):
+    """WHERE clause selecting rows strictly after ``(value, last_id)`` in ``_order_by`` order."""
+    sort_column = getattr(source, sort_by)
+    column = getattr(Task, sort_by)
+
+    if not column.nullable:
+        # Bind with the column type so enums compare by their stored representation.
+        key = tuple_(literal(value, column.type), literal(last_id, Task.id.type))
+        if descending:
+            return tuple_(sort_column, source.id) < key
+        return tuple_(sort_column, source.id) > key
+
+    if descending:
+        if value is None:
+            return or_(and_(sort_column.is_(None), source.id < last_id), sort_column.is_not(None))
+        return or_(sort_column < value, and_(sort_column == value, source.id < last_id))
+
+    if value is None:
+        return and_(sort_column.is_(None), source.id > last_id)
+    return or_(
+        sort_column > value,
+        and_(sort_column == value, source.id > last_id),
+        sort_column.is_(None),
+    )
+
+
+def _filter_tasks(
+    query: Query,
+    current_user: UserSnapshot,
     parent_id: int | None = None,
     status: TaskStatus | None = None,
     search: str | None = None,
-    limit: int = 10,
-    offset: int = 0,
-    sort_by: str = "created_at",
-    order: str = "desc"
-) -> PaginatedTaskResponse:
-    query = db.query(Task).filter(Task.user_id == current_user.id)
+    source=Task,
+):
+    """Apply the list filters shared by get_tasks and export; returns (query, rank)."""
+    query = query.filter(source.user_id == current_user.id)
 
     if parent_id is not None:
-        query = query.filter(Task.parent_id == parent_id)
+        query = query.filter(source.parent_id == parent_id)
     if status is not None:
-        query = query.filter(Task.status == status)
+        query = query.filter(source.status == status)
+
+    rank = None
     if search:
-        query = query.filter(Task.name.ilike(f"%{search}%"))
+        query, rank = apply_search(query, search, source)
+    return query, rank
+
 
-    VALID_SORT_FIELDS = {"created_at", "ended_at", "name", "status"}
-    if sort_by not in VALID_SORT_FIELDS:
-        logger.warning(f"Invalid sort field: {sort_by}")
+def _validate_sort(sort_by: str, rank):
+    if sort_by == RELEVANCE_SORT_FIELD:
+        if rank is None:
+            raise BadRequestException("Sorting by relevance requires a search term")
+    elif sort_by not in VALID_SORT_FIELDS:
+        logger.warning("Invalid sort field: %s", sort_by)
         raise BadRequestException(
             f"Invalid sort field '{sort_by}'. Must be one of {', '.join(VALID_SORT_FIELDS)}"
         )
 
-    sort_column = getattr(Task, sort_by)
-    sort_direction = sort_column.desc() if order == "desc" else sort_column.asc()
 
-    total = query.count()
-    items = query.order_by(sort_direction).offset(offset).limit(limit).all()
+def _apply_sort(query: Query, sort_by: str, descending: bool, rank=None, source=Task) -> Query:
+    if sort_by == RELEVANCE_SORT_FIELD:
+        return query.order_by(rank.desc() if descending else rank.asc(), source.id.desc())
+    return query.order_by(*_order_by(sort_by, descending, source))
 
-    logger.info(f"Returning {len(items)} tasks out of {total}")
 
-    current_page = (offset // limit) + 1
-    total_pages = (total + limit - 1) // limit
+def _get_task_page(
+    db: Session,
+    current_user: UserSnapshot,
+    parent_id: int | None = None,
+    status: TaskStatus | None = None,
+    search: str | None = None,
+    limit: int = 10,
+    offset: int = 0,
+    sort_by: str = "created_at",
+    order: str = "desc",
+    cursor: str | None = None,
+    total_mode: str = "exact",
+    fields: tuple[str, ...] = TASK_FIELDS,
+    include_archived: bool = False,
+) -> dict:
+    """One page of tasks as PaginatedTaskResponse fields, with column rows as items.
+
+    Rows start with ``fields``; the sort column and id follow when needed for cursors.
+    Archived tasks are only read with ``include_archived``.
+    """
+    source = _listing_source(current_user, include_archived, status)
+    cursor_columns = ("id", sort_by) if sort_by in VALID_SORT_FIELDS else ("id",)
+    columns = _task_columns(fields, *cursor_columns, source=source)
+    query, rank = _filter_tasks(db.query(*columns), current_user, parent_id, status, search, source)
+    _validate_sort(sort_by, rank)
+    if sort_by == RELEVANCE_SORT_FIELD and cursor is not None:
+        raise BadRequestException("Cursor pagination is not supported for relevance ordering")
 
-    next_page = current_page + 1 if offset + limit < total else None
-    previous_page = current_page - 1 if current_page > 1 else None
+    with profile_phase("count"):
+        total = count_tasks(query, current_user.id, (parent_id, status, search, source is not Task), total_mode)
 
-    return PaginatedTaskResponse(
+    direction = "next"
+    descending = order == "desc"
+    page_query = query
+    if cursor is not None:
+        if offset:
+            raise BadRequestException("Use either cursor or offset, not both")
+        payload = decode_cursor(cursor)
+        if payload.get("sort_by") != sort_by or payload.get("order") != order:
+            raise BadRequestException("Cursor does not match the requested sort order")
+        if payload.get("direction") not in ("next", "prev") or not isinstance(payload.get("id"), int):
+            raise BadRequestException("Invalid cursor")
+
+        direction = payload["direction"]
+        if direction == "prev":
+            descending = not descending
+        value = _parse_cursor_value(sort_by, payload.get("value"))
+        page_query = page_query.filter(_seek_after(sort_by, value, payload["id"], descending, source))
+
+    page_query = _apply_sort(page_query, sort_by, descending, rank, source)
+    if cursor is None:
+        page_query = page_query.offset(offset)
+
+    # Fetch one extra row to learn whether another page exists without a second query.
+    with profile_phase("page"):
+        items = page_query.limit(limit + 1).all()
+    has_more = len(items) > limit
+    items = items[:limit]
+    if direction == "prev":
+        items.reverse()
+
+    volume_logger.info("Returning %s tasks out of %s", len(items), total if total is not None else "uncounted")
+
+    next_cursor = prev_cursor = None
+    # Relevance is computed per query, so it only supports offset paging.
+    if items and sort_by != RELEVANCE_SORT_FIELD:
+        if has_more or direction == "prev":
+            next_cursor = _make_cursor(items[-1], sort_by, order, "next")
+        if (has_more and direction == "prev") or (direction == "next" and (cursor is not None or offset)):
+            prev_cursor = _make_cursor(items[0], sort_by, order, "prev")
+
+    total_pages = (total + limit - 1) // limit if total is not None else None
+    if cursor is not None:
+        current_page = next_page = previous_page = None
+    else:
+        current_page = (offset // limit) + 1
+        next_page = current_page + 1 if has_more else None
+        previous_page = current_page - 1 if current_page > 1 else None
+
+    return dict(
         total=total,
         page=current_page,
         page_size=limit,
         total_pages=total_pages,
         next_page=next_page,
         previous_page=previous_page,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
         items=items
     )
 
 
-def get_task(task_id: int, db: Session, current_user: User):
+def get_tasks(db: Session, current_user: UserSnapshot, **params) -> PaginatedTaskResponse:
+    """A page of tasks; takes the keyword arguments of ``_get_task_page``."""
+    return PaginatedTaskResponse(**_get_task_page(db, current_user, **params))
+
+
+def get_tasks_json(db: Session, current_user: UserSnapshot, fields: str | None = None, **params) -> bytes:
+    """``get_tasks`` encoded straight to JSON bytes, skipping the pydantic models.
+
+    Items carry only ``fields`` when given. With every field, the output is
+    byte-identical to FastAPI serializing the PaginatedTaskResponse.
+    """
+    selected = resolve_fields(fields)
+    page = _get_task_page(db, current_user, fields=selected, **params)
+    with profile_phase("encode"):
+        return encode_page(page, selected)
+
+
+def get_tasks_etag(db: Session, current_user: UserSnapshot, fields: str | None = None, **params) -> str:
+    """ETag of the get_tasks_json page for these arguments, without running the listing.
+
+    Every write to a user's tasks bumps users.task_generation in its own transaction, so
+    the generation plus the arguments identify the page. Read it before rendering: a
+    write landing in between leaves the ETag older than the body, which costs a later
+    re-render but never a stale 304.
+    """
+    with profile_phase("etag"):
+        generation = db.scalar(select(User.task_generation).where(User.id == current_user.id))
+    return make_etag("tasks", current_user.id, generation, resolve_fields(fields), sorted(params.items()))
+
+
+def bump_task_generation(db: Session, user_ids) -> None:
+    """Invalidate the listing ETags of ``user_ids``; call inside the transaction that writes their tasks."""
+    db.execute(
+        update(User).where(User.id.in_(user_ids)).values(task_generation=User.task_generation + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _task_etag(task_id: int, updated_at: datetime | None, fields: tuple[str, ...]) -> str:
+    return make_etag("task", task_id, updated_at, fields)
+
+
+def _select_task(db: Session, task_id: int, columns: tuple[str, ...], *conditions):
+    """Row of ``columns`` for ``task_id`` from tasks, or from tasks_archive only when it is not live.
+
+    ``conditions`` are callables building extra WHERE clauses for a given source.
+    """
+    for source in (Task, TaskArchive):
+        row = db.execute(
+            select(*_task_columns(tuple(dict.fromkeys(columns)), source=source))
+            .where(source.id == task_id, *(condition(source) for condition in conditions))
+        ).first()
+        if row is not None:
+            return row
+    return None
+
+
+def _load_task(db: Session, task_id: int) -> Task | TaskArchive | None:
+    """The live task, else its archived copy; the archive is only read on a miss."""
     task = db.query(Task).filter(Task.id == task_id).first()
+    if task is None:
+        task = db.query(TaskArchive).filter(TaskArchive.id == task_id).first()
+    return task
 
+
+def get_task_etag(task_id: int, db: Session, current_user: UserSnapshot, fields: str | None = None) -> str | None:
+    """ETag of one of the user's tasks without loading it; None if it is missing or not theirs."""
+    selected = resolve_fields(fields)
+    with profile_phase("etag"):
+        updated = _select_task(db, task_id, ("updated_at",), lambda source: source.user_id == current_user.id)
+    return _task_etag(task_id, updated[0], selected) if updated is not None else None
+
+
+def _check_viewable(task, task_id: int, current_user: UserSnapshot):
     if not task:
-        logger.warning(f"Task not found: {task_id}")
-        raise NotFoundException(f"Task with id {task_id} not found")
+        logger.warning("Task not found: %s", task_id)
+        raise NotFoundException(f"Task with ID {task_id} not found")
 
     if task.user_id != current_user.id:
-        logger.warning(f"Unauthorized access by '{current_user.username}' on task {task_id}")
+        logger.warning("Unauthorized access by '%s' on task %s", current_user.username, task_id)
         raise UnauthorizedException("You do not have permission to view this task.")
 
-    logger.info(f"Task {task_id} returned to user {current_user.username}")
+
+def get_task(task_id: int, db: Session, current_user: UserSnapshot):
+    task = _load_task(db, task_id)
+    _check_viewable(task, task_id, current_user)
+    volume_logger.info("Task %s returned to user %s", task_id, current_user.username)
     return task
 
 
-def create_task(db: Session, task: TaskCreate, current_user: User):
+def get_task_json(task_id: int, db: Session, current_user: UserSnapshot,
+                  fields: str | None = None) -> tuple[bytes, str]:
+    """A task as JSON bytes (only ``fields`` when given) and its ETag, from one column-only select."""
+    selected = resolve_fields(fields)
+    row = _select_task(db, task_id, selected + ("user_id", "updated_at"))
+    _check_viewable(row, task_id, current_user)
+    volume_logger.info("Task %s returned to user %s", task_id, current_user.username)
+    return encode_task(row, selected), _task_etag(task_id, row.updated_at, selected)
+
+
+def get_finished_task_json(task_id: int, db: Session, current_user: UserSnapshot,
+                           fields: str | None = None) -> bytes | None:
+    """The task as JSON bytes once it has left RUNNING, or None while it still runs."""
+    selected = resolve_fields(fields)
+    row = _select_task(db, task_id, selected + ("user_id", "status"))
+    _check_viewable(row, task_id, current_user)
+    if row.status == TaskStatus.RUNNING:
+        return None
+    return encode_task(row, selected)
+
+
+def create_task(db: Session, task: TaskCreate, current_user: UserSnapshot):
     if not task.name:
         logger.error("Task name is required but was not provided")
         raise UnprocessableEntityException("Task name is required")
@@ -94,22 +392,86 @@ def create_task(db: Session, task: TaskCreate, current_user: User):
         user_id=current_user.id
     )
     db.add(new_task)
+    bump_task_generation(db, [current_user.id])
     db.commit()
+    invalidate_task_counts(current_user.id)
     db.refresh(new_task)
-    logger.info(f"Task created with id: {new_task.id} by user {current_user.username}")
+    _publish("created", current_user, task_row_to_dict(new_task))
+    logger.info("Task created with id: %s by user %s", new_task.id, current_user.username)
     return new_task
 
 
-def fork_task(parent_id: int, db: Session, current_user: User) -> Task:
-    parent = db.query(Task).filter(Task.id == parent_id).first()
+def _publish(event_type: str, current_user: UserSnapshot, data: dict) -> None:
+    """Announce a committed write to the user's live event streams.
+
+    Bulk writes publish one summary event rather than one per row, so a large batch
+    cannot overflow every subscriber's buffer at once.
+    """
+    task_events.publish(event_type, current_user.id, data)
+
+
+def _check_batch_size(size: int):
+    if size < 1:
+        raise UnprocessableEntityException("At least one task is required")
+    if size > settings.TASK_BATCH_MAX_SIZE:
+        raise UnprocessableEntityException(
+            f"Batch size {size} exceeds the limit of {settings.TASK_BATCH_MAX_SIZE}"
+        )
+
+
+def _bulk_insert_tasks(db: Session, rows: list[dict], current_user: UserSnapshot) -> List[TaskResponse]:
+    # One multi-row INSERT ... RETURNING in a single transaction.
+    bump_task_generation(db, [current_user.id])
+    created = db.scalars(insert(Task).returning(Task, sort_by_parameter_order=True), rows).all()
+    # Snapshot before commit, which would expire every row and force a refresh per task.
+    items = [TaskResponse.model_validate(task) for task in created]
+    db.commit()
+    return items
+
+
+def create_tasks(db: Session, tasks: List[TaskCreate], current_user: UserSnapshot) -> List[TaskResponse]:
+    _check_batch_size(len(tasks))
+    if not all(task.name for task in tasks):
+        logger.error("Task name is required but was not provided")
+        raise UnprocessableEntityException("Task name is required")
+
+    now = datetime.utcnow()
+    items = _bulk_insert_tasks(db, [
+        {
+            "name": task.name,
+            "status": TaskStatus.RUNNING,
+            "created_at": now,
+            "started_at": now,
+            "user_id": current_user.id,
+        }
+        for task in tasks
+    ], current_user)
+    invalidate_task_counts(current_user.id)
+    _publish("batch_created", current_user, {"ids": [item.id for item in items], "count": len(items)})
+    logger.info("Batch created %s tasks by user %s", len(items), current_user.username)
+    return items
+
+
+def _get_forkable_parent(parent_id: int, db: Session, current_user: UserSnapshot) -> Task:
+    parent = _load_task(db, parent_id)
 
     if not parent:
-        raise NotFoundException(f"Task with id {parent_id} not found")
+        raise NotFoundException(f"Task with ID {parent_id} not found")
 
     if parent.user_id != current_user.id:
-        logger.warning(f"User '{current_user.username}' unauthorized to fork task {parent_id}")
+        logger.warning("User '%s' unauthorized to fork task %s", current_user.username, parent_id)
         raise UnauthorizedException("You do not have permission to fork this task.")
 
+    if isinstance(parent, TaskArchive):
+        # Children must point at a live task: the archiver only moves tasks without live children.
+        raise BadRequestException("Archived tasks cannot be forked")
+
+    return parent
+
+
+def fork_task(parent_id: int, db: Session, current_user: UserSnapshot) -> Task:
+    parent = _get_forkable_parent(parent_id, db, current_user)
+
     new_task = Task(
         name=parent.name,
         status=TaskStatus.RUNNING.value,
@@ -119,28 +481,167 @@ def fork_task(parent_id: int, db: Session, current_user: User) -> Task:
         user_id=current_user.id
     )
     db.add(new_task)
+    bump_task_generation(db, [current_user.id])
     db.commit()
+    invalidate_task_counts(current_user.id)
     db.refresh(new_task)
-    logger.info(f"User '{current_user.username}' forked task {parent.id} to new task {new_task.id}")
+    _publish("forked", current_user, task_row_to_dict(new_task))
+    logger.info("User '%s' forked task %s to new task %s", current_user.username, parent.id, new_task.id)
     return new_task
 
 
-def kill_task(task_id: int, db: Session, current_user: User):
-    task = db.query(Task).filter(Task.id == task_id).first()
+def fork_tasks(parent_id: int, count: int, db: Session, current_user: UserSnapshot) -> List[TaskResponse]:
+    _check_batch_size(count)
+    parent = _get_forkable_parent(parent_id, db, current_user)
+
+    now = datetime.utcnow()
+    row = {
+        "name": parent.name,
+        "status": TaskStatus.RUNNING,
+        "created_at": now,
+        "started_at": now,
+        "parent_id": parent.id,
+        "user_id": current_user.id,
+    }
+    items = _bulk_insert_tasks(db, [row] * count, current_user)
+    invalidate_task_counts(current_user.id)
+    _publish("batch_forked", current_user,
+             {"parent_id": parent.id, "ids": [item.id for item in items], "count": len(items)})
+    logger.info("User '%s' forked task %s into %s new tasks", current_user.username, parent.id, len(items))
+    return items
+
+
+def _get_killable_task(task_id: int, db: Session, current_user: UserSnapshot) -> Task | TaskArchive:
+    # Archived tasks have finished, so they are found only to be refused as not running.
+    task = _load_task(db, task_id)
 
     if not task:
-        raise NotFoundException(f"Task with id {task_id} not found")
+        raise NotFoundException(f"Task with ID {task_id} not found")
 
     if task.user_id != current_user.id:
-        logger.warning(f"User '{current_user.username}' unauthorized to kill task {task_id}")
+        logger.warning("User '%s' unauthorized to kill task %s", current_user.username, task_id)
         raise UnauthorizedException("You do not have permission to delete this task.")
 
+    return task
+
+
+def kill_task(task_id: int, db: Session, current_user: UserSnapshot):
+    task = _get_killable_task(task_id, db, current_user)
+
     if task.status != TaskStatus.RUNNING.value:
         raise BadRequestException("Only running tasks can be killed")
 
     task.status = TaskStatus.KILLED.value
     task.ended_at = datetime.utcnow()
+    bump_task_generation(db, [current_user.id])
     db.commit()
+    invalidate_task_counts(current_user.id)
     db.refresh(task)
-    logger.info(f"User '{current_user.username}' killed task {task_id}")
+    _publish("killed", current_user, task_row_to_dict(task))
+    task_waiters.notify(task.id)
+    logger.info("User '%s' killed task %s", current_user.username, task_id)
     return task
+
+
+def _subtree_ids(root_id: int, user_id: int):
+    """Recursive CTE selecting ``root_id`` and every descendant owned by ``user_id``."""
+    # nesting keeps the WITH inside the IN (...) subquery, so the outer statement stays a
+    # plain UPDATE and drivers report its rowcount.
+    tree = select(Task.id).where(Task.id == root_id).cte("subtree", recursive=True, nesting=True)
+    # Forks never form cycles, so UNION ALL avoids the duplicate elimination of UNION.
+    tree = tree.union_all(
+        select(Task.id).where(Task.user_id == user_id, Task.parent_id == tree.c.id)
+    )
+    return select(tree.c.id)
+
+
+def kill_task_tree(task_id: int, db: Session, current_user: UserSnapshot) -> TaskKillSummary:
+    _get_killable_task(task_id, db, current_user)
+
+    ended_at = datetime.utcnow()
+    result = db.execute(
+        update(Task)
+        .where(Task.id.in_(_subtree_ids(task_id, current_user.id)), Task.status == TaskStatus.RUNNING)
+        .values(status=TaskStatus.KILLED, ended_at=ended_at)
+        .execution_options(synchronize_session=False)
+    )
+    bump_task_generation(db, [current_user.id])
+    db.commit()
+    invalidate_task_counts(current_user.id)
+    summary = TaskKillSummary(task_id=task_id, killed=result.rowcount, ended_at=ended_at)
+    _publish("tree_killed", current_user, summary.model_dump(mode="json"))
+    task_waiters.notify_user(current_user.id)
+    logger.info("User '%s' killed %s tasks in the tree of task %s", current_user.username, result.rowcount, task_id)
+    return summary
+
+
+def stream_task_tree(
+    task_id: int,
+    db: Session,
+    current_user: UserSnapshot,
+    max_depth: int | None = None,
+    fmt: str = "json",
+    include_counts: bool = False,
+) -> Iterator[str]:
+    # Ownership errors must surface before the response starts streaming.
+    root = get_task(task_id, db, current_user)
+    statement = build_tree_query(
+        task_id, current_user.id, max_depth, db.get_bind().dialect.name, type(root)
+    ).execution_options(
+        yield_per=STREAM_BATCH_SIZE
+    )
+    # get_db closes the request session before the body streams, so the generator reads
+    # through a session of its own, on the engine (replica or primary) the check used.
+    bind = db.get_bind(clause=statement)
+
+    def generate() -> Iterator[str]:
+        encoder = TaskTreeEncoder(fmt, include_counts)
+        with Session(bind) as stream_db:
+            for row in stream_db.execute(statement):
+                yield from encoder.feed(row)
+        yield from encoder.finish()
+
+    return generate()
+
+
+def build_export_query(
+    db: Session,
+    current_user: UserSnapshot,
+    parent_id: int | None = None,
+    status: TaskStatus | None = None,
+    search: str | None = None,
+    sort_by: str = "created_at",
+    order: str = "desc",
+    fields: tuple[str, ...] = TASK_FIELDS,
+) -> Query:
+    query, rank = _filter_tasks(db.query(*_task_columns(fields)), current_user, parent_id, status, search)
+    _validate_sort(sort_by, rank)
+    return _apply_sort(query, sort_by, order == "desc", rank)
+
+
+def export_tasks(
+    db: Session,
+    current_user: UserSnapshot,
+    parent_id: int | None = None,
+    status: TaskStatus | None = None,
+    search: str | None = None,
+    sort_by: str = "created_at",
+    order: str = "desc",
+    fmt: str = "ndjson",
+    fields: str | None = None,
+) -> Iterator[str]:
+    selected = resolve_fields(fields)
+    query = build_export_query(db, current_user, parent_id, status, search, sort_by, order, selected)
+    statement = query.statement.execution_options(yield_per=STREAM_BATCH_SIZE)
+    # See stream_task_tree: the rows are read through the generator's own session.
+    bind = db.get_bind(clause=statement)
+    logger.info("User '%s' started a %s export", current_user.username, fmt)
+
+    def generate() -> Iterator[str]:
+        if fmt == "csv":
+            yield csv_header(selected)
+        with Session(bind) as stream_db:
+            for rows in stream_db.execute(statement).partitions():
+                yield encode_rows(rows, fmt, selected)
+
+    return generate()
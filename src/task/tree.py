@@ -0,0 +1,96 @@
+import json
+from typing import Iterator
+
+from sqlalchemy import Integer, Text, cast, literal, select
+
+from .encoding import task_row_to_dict
+from .models import Task
+
+
+def build_tree_query(root_id: int, user_id: int, max_depth: int | None = None, dialect: str = "sqlite",
+                     source=Task):
+    """One recursive CTE returning the subtree of ``root_id`` in pre-order.
+
+    ``source`` is Task, or TaskArchive for an archived root, whose subtree is archived too.
+
+    Each row carries its ``depth`` below the root and a ``path`` of ids joined by "/".
+    Ordering by path keeps every subtree contiguous ('/' sorts before any digit); on
+    Postgres that needs the byte-wise "C" collation, as locale collations skip punctuation.
+    """
+    columns = (source.id, source.name, source.status, source.created_at, source.started_at, source.ended_at,
+               source.parent_id)
+    tree = (
+        select(*columns, literal(0, Integer).label("depth"), cast(source.id, Text).label("path"))
+        .where(source.id == root_id, source.user_id == user_id)
+        .cte("tree", recursive=True)
+    )
+    children = select(
+        *columns,
+        (tree.c.depth + 1).label("depth"),
+        cast(tree.c.path + "/" + cast(source.id, Text), Text).label("path"),
+    ).where(source.user_id == user_id, source.parent_id == tree.c.id)
+    if max_depth is not None:
+        children = children.where(tree.c.depth < max_depth)
+    tree = tree.union_all(children)
+    path = tree.c.path.collate("C") if dialect == "postgresql" else tree.c.path
+    return select(tree).order_by(path)
+
+
+class TaskTreeEncoder:
+    """Incrementally encodes pre-ordered tree rows as nested JSON or NDJSON.
+
+    Only the chain of open ancestors is held in memory, so output of any size streams
+    with memory bounded by the tree depth. Descendant counts are only known once a
+    subtree closes: nested JSON writes them after ``children``, and NDJSON emits each
+    node after its descendants (post-order) when counts are requested.
+    """
+
+    def __init__(self, fmt: str = "json", include_counts: bool = False):
+        self.fmt = fmt
+        self.include_counts = include_counts
+        # [depth, node, descendant_count, has_children]
+        self._stack: list[list] = []
+
+    def _node(self, row) -> dict:
+        node = task_row_to_dict(row)
+        node["depth"] = row.depth
+        node["path"] = [int(part) for part in row.path.split("/")]
+        return node
+
+    def _close(self) -> Iterator[str]:
+        depth, node, count, _ = self._stack.pop()
+        if self._stack:
+            self._stack[-1][2] += count + 1
+
+        if self.fmt == "ndjson":
+            if self.include_counts:
+                node["descendant_count"] = count
+                yield json.dumps(node) + "\n"
+            return
+
+        closing = "]"
+        if self.include_counts:
+            closing += f',"descendant_count":{count}'
+        yield closing + "}"
+
+    def feed(self, row) -> Iterator[str]:
+        while self._stack and self._stack[-1][0] >= row.depth:
+            yield from self._close()
+
+        node = self._node(row)
+        if self.fmt == "ndjson":
+            if not self.include_counts:
+                yield json.dumps(node) + "\n"
+        else:
+            prefix = ""
+            if self._stack:
+                prefix = "," if self._stack[-1][3] else ""
+                self._stack[-1][3] = True
+            yield prefix + json.dumps(node)[:-1] + ',"children":['
+
+        keep = self.fmt == "ndjson" and self.include_counts
+        self._stack.append([row.depth, node if keep else None, 0, False])
+
+    def finish(self) -> Iterator[str]:
+        while self._stack:
+            yield from self._close()
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+
+from src.common.metrics import registry
+
+
+class Waiter:
+    """One request parked until a task may have left RUNNING, bound to its event loop."""
+
+    def __init__(self, task_id: int, user_id: int):
+        self.task_id = task_id
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self._woken = self.loop.create_future()
+
+    def _wake(self) -> None:
+        if not self._woken.done():
+            self._woken.set_result(None)
+
+    async def wait(self, timeout: float) -> bool:
+        """Whether the waiter was woken within ``timeout`` seconds."""
+        try:
+            await asyncio.wait_for(self._woken, timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class TaskWaiters:
+    """Registry of requests waiting on tasks, woken by the writes that end them.
+
+    Writers commit in worker threads, so wakeups reach each waiter's loop through
+    ``call_soon_threadsafe`` rather than an asyncio.Condition, which only works within
+    one loop. A parked waiter is a future and a set entry; nothing polls. Like the
+    event broker this is per process, so waiters re-read the task when they time out.
+    """
+
+    def __init__(self):
+        self._by_task: dict[int, set[Waiter]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, task_id: int, user_id: int) -> Waiter:
+        """Park from the running loop; register before reading the task so no kill is missed."""
+        waiter = Waiter(task_id, user_id)
+        with self._lock:
+            self._by_task.setdefault(task_id, set()).add(waiter)
+        return waiter
+
+    def discard(self, waiter: Waiter) -> None:
+        with self._lock:
+            waiters = self._by_task.get(waiter.task_id)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._by_task[waiter.task_id]
+
+    def notify(self, task_id: int) -> None:
+        with self._lock:
+            waiters = list(self._by_task.get(task_id, ()))
+        self._wake(waiters)
+
+    def notify_user(self, user_id: int) -> None:
+        """Wake all of a user's waiters, for writes that do not report which tasks they ended."""
+        with self._lock:
+            waiters = [waiter for waiters in self._by_task.values() for waiter in waiters
+                       if waiter.user_id == user_id]
+        self._wake(waiters)
+
+    def _wake(self, waiters: list[Waiter]) -> None:
+        for waiter in waiters:
+            try:
+                waiter.loop.call_soon_threadsafe(waiter._wake)
+            except RuntimeError:
+                # Its event loop has closed under it.
+                self.discard(waiter)
+
+    def count(self) -> int:
+        with self._lock:
+            return sum(len(waiters) for waiters in self._by_task.values())
+
+
+task_waiters = TaskWaiters()
+registry.callback("task_waiters", "Requests parked in GET /tasks/{id}/wait.", "gauge",
+                  lambda: {(): task_waiters.count()})
@@ -1,11 +1,16 @@
 import os
 
+# Keep bcrypt cheap in tests; still above the 4 rounds used for "weak" hashes.
+os.environ.setdefault("BCRYPT_ROUNDS", "5")
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from src.auth.cache import principal_cache
 from src.db.database import get_db, Base
 from src.main import app
+from src.task.counts import task_count_cache
 
 # Clean up test DB file before running
 if os.path.exists("test.db"):
@@ -15,6 +20,9 @@ SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+TEST_USERNAME = "tester"
+TEST_PASSWORD = "secret"
+
 
 # Override DB dependency
 def override_get_db():
@@ -32,6 +40,13 @@ app.dependency_overrides[get_db] = override_get_db
 def fast_api_test_client():
     from fastapi.testclient import TestClient
     Base.metadata.create_all(bind=engine)
+    # Every test starts from an empty database with recycled ids, and logs in again as the
+    # same user, often with a byte-identical token: drop what earlier tests cached.
+    task_count_cache.clear()
+    principal_cache.clear()
     with TestClient(app) as c:
+        c.post("/auth/register", json={"username": TEST_USERNAME, "password": TEST_PASSWORD})
+        response = c.post("/auth/login", json={"username": TEST_USERNAME, "password": TEST_PASSWORD})
+        c.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
         yield c
     Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from src.common import admission
+from src.common.admission import ConcurrencyGate, UserRateLimiter, route_class
+
+
+def test_route_classes():
+    assert route_class({"path": "/auth/login", "method": "POST"}) == "auth"
+    assert route_class({"path": "/tasks", "method": "GET"}) == "read"
+    assert route_class({"path": "/tasks/3", "method": "DELETE"}) == "write"
+    assert route_class({"path": "/tasks/3/wait", "method": "GET"}) is None
+
+
+@pytest.mark.asyncio
+async def test_gate_queues_then_sheds():
+    gate = ConcurrencyGate(limit=1, max_queue=1, timeout=0.05)
+    assert await gate.acquire() is None
+
+    queued = asyncio.ensure_future(gate.acquire())
+    await asyncio.sleep(0)
+    assert gate.queued == 1
+    assert await gate.acquire() == "queue_full"
+    # A finishing request hands its slot to the queued one.
+    gate.release()
+    assert await queued is None
+    assert (gate.active, gate.queued) == (1, 0)
+
+    assert await gate.acquire() == "queue_timeout"
+    gate.release()
+    assert gate.active == 0
+
+
+def test_user_rate_limiter(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    limiter = UserRateLimiter(rate=2, burst=2)
+
+    assert [limiter.acquire(1) for _ in range(3)] == [0, 0, 0.5]
+    assert limiter.acquire(2) == 0
+    now[0] += 0.5
+    assert limiter.acquire(1) == 0
+
+
+def test_overload_and_rate_limit_responses(fast_api_test_client, monkeypatch):
+    write = admission.admission_gates["write"]
+    monkeypatch.setattr(write, "limit", 1)
+    monkeypatch.setattr(write, "max_queue", 0)
+    monkeypatch.setattr(write, "active", 1)
+    response = fast_api_test_client.post("/tasks", json={"name": "shed"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    # Other route classes keep their own capacity.
+    assert fast_api_test_client.get("/tasks").status_code == 200
+
+    monkeypatch.setattr(admission, "user_rate_limiter", UserRateLimiter(rate=0.5, burst=1))
+    assert fast_api_test_client.get("/tasks").status_code == 200
+    response = fast_api_test_client.get("/tasks")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "2"
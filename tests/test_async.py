@@ -0,0 +1,104 @@
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.auth.async_router import router as auth_router
+from src.auth.cache import principal_cache
+from src.common.exception_handler import register_exception_handlers
+from src.db.database import Base, get_async_db, to_async_url
+from src.task.async_router import router as task_router
+from tests.conftest import SQLALCHEMY_DATABASE_URL, TEST_USERNAME, TEST_PASSWORD, engine
+
+
+@pytest_asyncio.fixture
+async def async_client():
+    async_engine = create_async_engine(to_async_url(SQLALCHEMY_DATABASE_URL))
+    session_factory = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    register_exception_handlers(app)
+    app.include_router(auth_router)
+    app.include_router(task_router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    Base.metadata.create_all(bind=engine)
+    principal_cache.clear()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.post("/auth/register", json={"username": TEST_USERNAME, "password": TEST_PASSWORD})
+        response = await client.post("/auth/login", json={"username": TEST_USERNAME, "password": TEST_PASSWORD})
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        yield client
+    Base.metadata.drop_all(bind=engine)
+    await async_engine.dispose()
+
+
+def test_to_async_url():
+    assert to_async_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert to_async_url("postgresql://u:p@db/tasks") == "postgresql+asyncpg://u:p@db/tasks"
+
+
+@pytest.mark.asyncio
+async def test_async_task_lifecycle(async_client):
+    response = await async_client.post("/tasks", json={"name": "async parent"})
+    assert response.status_code == 201
+    parent = response.json()
+
+    response = await async_client.post(f"/tasks/{parent['id']}/fork")
+    assert response.status_code == 201
+    assert response.json()["parent_id"] == parent["id"]
+
+    response = await async_client.delete(f"/tasks/{parent['id']}")
+    assert response.json()["status"] == "killed"
+
+    data = (await async_client.get("/tasks", params={"search": "async", "limit": 1})).json()
+    assert data["total"] == 2
+    assert data["next_cursor"]
+
+    etag = (await async_client.get(f"/tasks/{parent['id']}")).headers["etag"]
+    response = await async_client.get(f"/tasks/{parent['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = await async_client.get("/tasks/9999")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_async_task_tree(async_client):
+    root = (await async_client.post("/tasks", json={"name": "root"})).json()
+    await async_client.post(f"/tasks/{root['id']}/fork", params={"count": 2})
+
+    response = await async_client.get(f"/tasks/{root['id']}/tree", params={"include_counts": True})
+    tree = response.json()
+    assert len(tree["children"]) == 2
+    assert tree["descendant_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_async_export(async_client):
+    await async_client.post("/tasks/batch", json=[{"name": f"export {i}"} for i in range(3)])
+
+    response = await async_client.get("/tasks/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 4
+
+
+@pytest.mark.asyncio
+async def test_async_wait_for_task(async_client):
+    import asyncio
+
+    from src.task.waiters import task_waiters
+
+    task = (await async_client.post("/tasks", json={"name": "waited on"})).json()
+    waiting = asyncio.ensure_future(async_client.get(f"/tasks/{task['id']}/wait", params={"timeout": 30}))
+    while not task_waiters.count():
+        await asyncio.sleep(0.01)
+    await async_client.delete(f"/tasks/{task['id']}")
+
+    response = await asyncio.wait_for(waiting, timeout=10)
+    assert response.json()["status"] == "killed"
@@ -0,0 +1,89 @@
+import pytest
+from passlib.context import CryptContext
+
+from src.auth.cache import UserSnapshot, invalidate_user, principal_cache
+from src.auth.hashing import PasswordHasher, _hash, _verify_and_update, pwd_context
+from src.auth.models import User
+from src.common.cache import TTLCache
+from src.common.exceptions import ServiceUnavailableException
+from tests.conftest import TEST_USERNAME, TEST_PASSWORD, TestingSessionLocal
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_respects_entry_ttl():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("expired", 1, ttl=0)
+    cache.set("short", 2, ttl=-5)
+    assert cache.get("expired") is None
+    assert cache.get("short") is None
+
+
+def test_current_user_is_cached(fast_api_test_client):
+    principal_cache.clear()
+    token = fast_api_test_client.headers["Authorization"].split()[1]
+
+    fast_api_test_client.get("/tasks")
+    cached = principal_cache.get(token)
+    assert isinstance(cached, UserSnapshot)
+    assert cached.username == TEST_USERNAME
+
+    hits = principal_cache.hits
+    assert fast_api_test_client.get("/tasks").status_code == 200
+    assert principal_cache.hits == hits + 1
+
+    assert invalidate_user(TEST_USERNAME) == 1
+    assert principal_cache.get(token) is None
+
+
+def test_invalid_token_rejected(fast_api_test_client):
+    response = fast_api_test_client.get("/tasks", headers={"Authorization": "Bearer nonsense"})
+    assert response.status_code == 401
+
+
+def test_password_hasher_rejects_when_full():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    hasher._slots.acquire()
+    try:
+        with pytest.raises(ServiceUnavailableException) as exc_info:
+            hasher.submit(_hash, "secret")
+        assert exc_info.value.headers["Retry-After"] == "1"
+    finally:
+        hasher._slots.release()
+        hasher.shutdown()
+
+
+def test_password_hasher_runs_in_pool():
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    try:
+        hashed = hasher.submit(_hash, "secret").result()
+        assert hasher.submit(_verify_and_update, "secret", hashed).result() == (True, None)
+    finally:
+        hasher.shutdown()
+
+
+def test_login_upgrades_weak_hash(fast_api_test_client):
+    weak_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    with TestingSessionLocal() as db:
+        user = db.query(User).filter(User.username == TEST_USERNAME).first()
+        user.hashed_password = weak_context.hash(TEST_PASSWORD)
+        db.commit()
+
+    response = fast_api_test_client.post("/auth/login", json={"username": TEST_USERNAME, "password": TEST_PASSWORD})
+    assert response.status_code == 200
+
+    with TestingSessionLocal() as db:
+        user = db.query(User).filter(User.username == TEST_USERNAME).first()
+        assert not pwd_context.needs_update(user.hashed_password)
+        assert pwd_context.verify(TEST_PASSWORD, user.hashed_password)
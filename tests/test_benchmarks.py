@@ -0,0 +1,32 @@
+from benchmarks.stats import find_regressions, percentile, summarize
+
+
+def test_percentiles_use_nearest_rank():
+    values = [i / 1000 for i in range(1, 101)]
+
+    assert percentile(values, 50) == 0.05
+    assert percentile(values, 99) == 0.099
+    assert percentile([], 95) == 0.0
+
+    summary = summarize(values, errors=2, elapsed=2.0)
+    assert summary["p95_ms"] == 95.0
+    assert summary["rps"] == 50.0
+    assert summary["errors"] == 2
+
+
+def test_find_regressions():
+    baseline = {"scenarios": {
+        "list": {"p95_ms": 10.0, "rps": 100.0, "errors": 0},
+        "search": {"p95_ms": 10.0, "rps": 100.0, "errors": 0},
+    }}
+    results = {"scenarios": {
+        "list": {"p95_ms": 11.9, "rps": 81.0, "errors": 0},
+        "search": {"p95_ms": 12.5, "rps": 70.0, "errors": 1},
+        "fork": {"p95_ms": 50.0, "rps": 1.0, "errors": 0},
+    }}
+
+    assert find_regressions(results, baseline, threshold=0.2) == [
+        "search: p95 12.5ms vs baseline 10.0ms",
+        "search: 70.0 req/s vs baseline 100.0 req/s",
+        "search: 1 errors vs baseline 0",
+    ]
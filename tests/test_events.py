@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.task.events import SlowConsumer, TaskEventBroker, sse_stream, task_events
+
+
+@pytest.mark.asyncio
+async def test_broker_delivers_resumes_and_evicts():
+    broker = TaskEventBroker(buffer_size=2, history_size=3)
+    subscription = broker.subscribe(user_id=1)
+
+    # Publishers run in worker threads; other users' events are not delivered.
+    thread = threading.Thread(target=lambda: [broker.publish("created", user, {"id": user}) for user in (2, 1)])
+    thread.start()
+    thread.join()
+    event = await subscription.get(timeout=1)
+    assert (event.type, event.data) == ("created", {"id": 1})
+    assert await subscription.get(timeout=0.01) is None
+
+    resumed = broker.subscribe(user_id=1, last_event_id=event.id - 2)
+    assert [e.id for e in resumed._events] == [event.id]
+    assert broker.subscribe(user_id=1, last_event_id=event.id)._events == type(resumed._events)()
+    # Ids this broker never issued mean the client may have missed events.
+    assert broker.subscribe(user_id=1, last_event_id=1)._events[0].type == "reset"
+
+    for i in range(3):
+        broker.publish("killed", 1, {"id": i})
+    await asyncio.sleep(0)
+    with pytest.raises(SlowConsumer):
+        while True:
+            await subscription.get(timeout=1)
+    assert subscription not in broker._subscribers.get(1, ())
+    # The three-event history now starts after ``event``: resuming from it replays
+    # the kills, resuming from before it is a gap.
+    assert [e.type for e in broker.subscribe(user_id=1, last_event_id=event.id)._events] == ["killed"] * 3
+    assert broker.subscribe(user_id=1, last_event_id=event.id - 1)._events[0].type == "reset"
+
+
+@pytest.mark.asyncio
+async def test_sse_stream():
+    stream = sse_stream(user_id=42, last_event_id=None)
+    first = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0)
+    event = task_events.publish("forked", 42, {"id": 7, "parent_id": 3})
+    assert await first == f'id: {event.id}\nevent: forked\ndata: {{"id": 7, "parent_id": 3}}\n\n'
+    await stream.aclose()
+    assert 42 not in task_events._subscribers
+
+
+def test_websocket_events(fast_api_test_client):
+    with fast_api_test_client.websocket_connect("/tasks/events/ws") as websocket:
+        task = fast_api_test_client.post("/tasks", json={"name": "watched"}).json()
+        forks = fast_api_test_client.post(f"/tasks/{task['id']}/fork", params={"count": 2}).json()
+        fast_api_test_client.delete(f"/tasks/{task['id']}", params={"recursive": True})
+
+        messages = [websocket.receive_json() for _ in range(3)]
+        assert [message["type"] for message in messages] == ["created", "batch_forked", "tree_killed"]
+        assert messages[0]["data"]["name"] == "watched"
+        # Bulk writes arrive as one summary each, however many rows they touched.
+        assert messages[1]["data"] == {"parent_id": task["id"], "ids": [fork["id"] for fork in forks], "count": 2}
+        assert messages[2]["data"]["task_id"] == task["id"]
+        assert messages[2]["data"]["killed"] == 3
+
+    with fast_api_test_client.websocket_connect(
+            "/tasks/events/ws", params={"last_event_id": messages[0]["id"]}) as websocket:
+        assert [websocket.receive_json()["id"] for _ in range(2)] == [message["id"] for message in messages[1:]]
@@ -0,0 +1,70 @@
+import logging
+
+import pytest
+
+from src.auth.cache import invalidate_user
+from src.auth.models import User
+from src.common import router as common_router
+from src.common.logger import ring_buffer_handler, tail_lines
+from tests.conftest import TEST_USERNAME, TestingSessionLocal
+
+
+@pytest.fixture
+def admin_client(fast_api_test_client):
+    with TestingSessionLocal() as db:
+        db.query(User).filter(User.username == TEST_USERNAME).update({"is_admin": True})
+        db.commit()
+    # Drop the cached non-admin principal
+    invalidate_user(TEST_USERNAME)
+    return fast_api_test_client
+
+
+def test_tail_lines(tmp_path):
+    path = tmp_path / "api.log"
+    path.write_text("".join(f"line {i}\n" for i in range(1000)))
+
+    assert tail_lines(str(path), 3, block_size=16) == ["line 997\n", "line 998\n", "line 999\n"]
+    assert tail_lines(str(path), 2, predicate=lambda line: line.endswith("5\n")) == ["line 985\n", "line 995\n"]
+    assert len(tail_lines(str(path), 5000)) == 1000
+
+
+def test_healthcheck_requires_admin(fast_api_test_client):
+    assert fast_api_test_client.get("/healthcheck").status_code == 403
+
+
+def _log(name: str, level: int, message: str):
+    ring_buffer_handler.handle(logging.makeLogRecord({"name": name, "levelno": level,
+                                                      "levelname": logging.getLevelName(level), "msg": message}))
+
+
+def test_healthcheck_memory_filters(admin_client):
+    _log("src.test.healthcheck", logging.WARNING, "something odd")
+    _log("src.test.other", logging.INFO, "routine")
+
+    response = admin_client.get("/healthcheck", params={"source": "memory", "level": "WARNING", "lines": 5})
+    assert response.status_code == 200
+    entries = response.json()["log_entries"]
+    assert entries[-1]["message"] == "something odd"
+    assert all(entry["level"] in ("WARNING", "ERROR", "CRITICAL") for entry in entries)
+
+    response = admin_client.get("/healthcheck", params={"source": "memory", "logger": "src.test"})
+    assert [entry["logger"] for entry in response.json()["log_entries"]][-2:] == [
+        "src.test.healthcheck", "src.test.other"
+    ]
+
+
+def test_healthcheck_file_tail(admin_client, tmp_path, monkeypatch):
+    log_file = tmp_path / "api.log"
+    log_file.write_text(
+        "[2024-01-01 00:00:00,000] [ERROR] [src.test.file]: disk is on fire\n"
+        + "".join(f"[2024-01-01 00:00:01,000] [INFO] [src.task.service]: request {i}\n" for i in range(50))
+    )
+    monkeypatch.setattr(common_router, "LOG_FILE", str(log_file))
+
+    response = admin_client.get("/healthcheck", params={"lines": 3})
+    assert response.json()["log_entries"][-1].endswith("request 49\n")
+    assert len(response.json()["log_entries"]) == 3
+
+    response = admin_client.get("/healthcheck", params={"level": "ERROR", "logger": "src.test"})
+    assert response.status_code == 200
+    assert response.json()["log_entries"] == ["[2024-01-01 00:00:00,000] [ERROR] [src.test.file]: disk is on fire\n"]
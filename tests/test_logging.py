@@ -0,0 +1,81 @@
+import logging
+import queue
+
+from src.common import logger as logger_module
+from src.common.logger import BoundedQueueHandler, CallSiteRateLimitFilter, LogWriter
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def _record(msg="Returning %s tasks", level=logging.INFO, lineno=10):
+    return logging.LogRecord("src.task.service", level, "service.py", lineno, msg, (5,), None)
+
+
+def test_rate_limit_is_per_call_site(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(logger_module.time, "monotonic", lambda: now[0])
+    rate_limit = CallSiteRateLimitFilter(rate=2)
+
+    assert [rate_limit.filter(_record()) for _ in range(4)] == [True, True, False, False]
+    # Another call site has its own budget, and warnings are never limited.
+    assert rate_limit.filter(_record(lineno=20))
+    assert rate_limit.filter(_record(level=logging.WARNING))
+
+    now[0] += 1
+    record = _record()
+    assert rate_limit.filter(record)
+    assert record.getMessage() == "Returning 5 tasks [2 similar messages suppressed]"
+
+
+def test_sampling(monkeypatch):
+    sampler = CallSiteRateLimitFilter(rate=0, sample_rate=0.5)
+    values = iter([0.1, 0.9, 0.4, 0.7])
+    monkeypatch.setattr(logger_module.random, "random", lambda: next(values))
+
+    assert [sampler.filter(_record()) for _ in range(4)] == [True, False, True, False]
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1), policy="drop")
+    for _ in range(3):
+        handler.handle(_record())
+
+    assert handler.dropped == 2
+
+
+def test_writer_flushes_queued_records_on_stop():
+    log_queue = queue.Queue(maxsize=100)
+    output = ListHandler()
+    writer = LogWriter(log_queue, output)
+    handler = BoundedQueueHandler(log_queue, policy="block")
+    writer.start()
+    for i in range(50):
+        handler.handle(_record(lineno=i))
+    writer.stop()
+
+    assert output.messages == ["Returning 5 tasks"] * 50
+    assert log_queue.empty()
+
+
+def test_only_volume_loggers_are_rate_limited(monkeypatch):
+    monkeypatch.setattr(logger_module._volume_filter, "rate", 1)
+    output = ListHandler()
+    module_logger = logger_module.get_logger("tests.volume_module")
+    module_logger.addHandler(output)
+    module_logger.setLevel(logging.INFO)
+    volume_logger = logger_module.get_volume_logger("tests.volume_module")
+    try:
+        for i in range(3):
+            volume_logger.info("Returning %s tasks", i)
+            module_logger.info("User %s killed a task", i)
+    finally:
+        module_logger.removeHandler(output)
+
+    assert output.messages == ["Returning 0 tasks"] + [f"User {i} killed a task" for i in range(3)]
@@ -0,0 +1,67 @@
+from sqlalchemy import create_engine, text
+
+from src.common.metrics import MetricsRegistry
+from src.db.instrumentation import (
+    _pool_usage,
+    db_pool_checkout_wait_seconds,
+    db_queries_total,
+    instrument_engine,
+)
+
+
+def test_render_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    requests.inc(route='/a"b')
+    requests.inc(route='/a"b')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a\\"b"} 2',
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1.0"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        "latency_seconds_sum 5.55",
+        "latency_seconds_count 3",
+    ]
+
+
+def test_instrument_engine_counts_queries_and_checkouts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+    instrument_engine(engine, "unit")
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("select 2"))
+
+    assert db_queries_total.value(engine="unit", statement="SELECT") == 2
+    assert db_pool_checkout_wait_seconds.count(engine="unit") == 1
+
+    # dispose() replaces the pool; checkouts from the new one are still timed and reported.
+    engine.dispose()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert db_pool_checkout_wait_seconds.count(engine="unit") == 2
+    assert "unit" in {name for name, _ in _pool_usage()}
+
+
+def test_metrics_endpoint(fast_api_test_client):
+    fast_api_test_client.get("/tasks")
+    fast_api_test_client.get("/tasks/12345")
+
+    response = fast_api_test_client.get("/metrics", headers={"Authorization": ""})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/tasks",status="200"}' in body
+    assert 'http_requests_total{method="GET",route="/tasks/{task_id}",status="404"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/tasks",le="+Inf"}' in body
+    assert 'http_requests_in_progress{method="GET"} 1' in body
+    assert "auth_cache_hits_total" in body
+    assert 'db_pool_connections{engine="primary",state="checked_out"}' in body
@@ -0,0 +1,78 @@
+import pytest
+
+from src.auth.cache import invalidate_user
+from src.auth.models import User
+from src.common.profiling import RequestProfile
+from src.db.instrumentation import instrument_engine
+from tests.conftest import TEST_USERNAME, TestingSessionLocal, engine
+
+# The tests use their own engine; hook it up so its statements are profiled too.
+instrument_engine(engine, "test")
+
+
+@pytest.fixture
+def admin_client(fast_api_test_client):
+    with TestingSessionLocal() as db:
+        db.query(User).filter(User.username == TEST_USERNAME).update({"is_admin": True})
+        db.commit()
+    invalidate_user(TEST_USERNAME)
+    return fast_api_test_client
+
+
+def _timings(response) -> dict:
+    entries = {}
+    for entry in response.headers["server-timing"].split(", "):
+        name, *params = entry.split(";")
+        entries[name] = dict(param.split("=", 1) for param in params)
+    return entries
+
+
+def test_profiling_is_opt_in(admin_client):
+    assert "server-timing" not in admin_client.get("/tasks").headers
+
+
+def test_profile_hidden_from_non_admins(fast_api_test_client):
+    response = fast_api_test_client.get("/tasks", headers={"X-Profile": "1"})
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+
+
+@pytest.mark.parametrize("mode", ["cprofile", "tracemalloc"])
+def test_expensive_modes_need_authorization(fast_api_test_client, monkeypatch, mode):
+    from src.common import profiling
+
+    monkeypatch.setattr(profiling, "_start_tracemalloc", lambda: pytest.fail("tracemalloc started"))
+    monkeypatch.setattr(profiling.cProfile, "Profile", lambda: pytest.fail("cProfile started"))
+    response = fast_api_test_client.get("/tasks", headers={"X-Profile": mode})
+    assert response.status_code == 200
+    assert "x-profile-report" not in response.headers
+
+
+def test_server_timing_phases(admin_client):
+    admin_client.post("/tasks", json={"name": "a"})
+    response = admin_client.get("/tasks", headers={"X-Profile": "1"})
+
+    timings = _timings(response)
+    for phase in ("auth", "deps", "count", "page", "endpoint", "serialize", "db", "sql-1", "total"):
+        assert phase in timings
+    assert timings["sql-1"]["desc"].startswith('"SELECT')
+
+
+def test_n_plus_one_suspects():
+    profile = RequestProfile("timing", authorized=True)
+    for _ in range(3):
+        profile.add_statement("SELECT * FROM tasks WHERE id = ?", 0.001)
+    profile.add_statement("SELECT count(*) FROM tasks", 0.001)
+
+    assert profile.n_plus_one_suspects() == [("SELECT * FROM tasks WHERE id = ?", 3)]
+
+
+@pytest.mark.parametrize("mode, marker", [("cprofile", "function calls"), ("tracemalloc", "size=")])
+def test_profile_report(admin_client, mode, marker):
+    response = admin_client.get("/tasks", headers={"X-Profile": mode})
+    report_id = response.headers["x-profile-report"]
+
+    report = admin_client.get(f"/debug/profiles/{report_id}")
+    assert report.status_code == 200
+    assert marker in report.text
+    assert admin_client.get("/debug/profiles/missing").status_code == 404
@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.db.database import Base, get_db
+from src.db.routing import RecentWriters, ReplicaSet, RoutingSession
+from src.main import app
+from src.task.constants import TaskStatus
+from src.task.models import Task
+from tests.conftest import engine as primary_engine
+
+
+@pytest.fixture
+def replica_engine(tmp_path):
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=replica)
+    yield replica
+    replica.dispose()
+
+
+def _route_through(replicas: ReplicaSet, recent_writers: RecentWriters):
+    factory = sessionmaker(
+        autocommit=False, autoflush=False, bind=primary_engine,
+        class_=RoutingSession, replicas=replicas, recent_writers=recent_writers,
+    )
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+
+
+@pytest.fixture
+def routed_client(fast_api_test_client, replica_engine):
+    original = app.dependency_overrides[get_db]
+    recent_writers = RecentWriters(window=60)
+    _route_through(ReplicaSet([replica_engine]), recent_writers)
+    yield fast_api_test_client, recent_writers
+    app.dependency_overrides[get_db] = original
+
+
+def _names(response):
+    return [task["name"] for task in response.json()["items"]]
+
+
+def test_reads_use_replica_until_user_writes(routed_client, replica_engine):
+    client, recent_writers = routed_client
+    with replica_engine.begin() as conn:
+        conn.execute(Task.__table__.insert(), [{"id": 1, "name": "replicated", "status": TaskStatus.RUNNING, "user_id": 1}])
+
+    assert _names(client.get("/tasks")) == ["replicated"]
+    assert client.get("/tasks/1").json()["name"] == "replicated"
+
+    # Right after a write the user reads their own data from the primary.
+    client.post("/tasks", json={"name": "fresh"})
+    assert _names(client.get("/tasks")) == ["fresh"]
+
+    recent_writers.clear()
+    assert _names(client.get("/tasks")) == ["replicated"]
+
+
+def test_unhealthy_replica_falls_back_to_primary(fast_api_test_client, tmp_path):
+    original = app.dependency_overrides[get_db]
+    dead = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    replicas = ReplicaSet([dead], check_interval=60)
+    _route_through(replicas, RecentWriters(window=0))
+    try:
+        fast_api_test_client.post("/tasks", json={"name": "primary only"})
+        assert _names(fast_api_test_client.get("/tasks")) == ["primary only"]
+        assert replicas.choose() is None
+    finally:
+        app.dependency_overrides[get_db] = original
+
+
+def test_round_robin_skips_down_replicas(tmp_path):
+    engines = [create_engine(f"sqlite:///{tmp_path / f'r{i}.db'}") for i in range(3)]
+    replicas = ReplicaSet(engines, check_interval=60)
+
+    assert [replicas.choose() for _ in range(3)] == engines
+    replicas.mark_down(engines[1])
+    assert [replicas.choose() for _ in range(4)] == [engines[0], engines[2], engines[0], engines[2]]
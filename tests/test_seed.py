@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.auth.models import User
+from src.db.bulk import finish_load, next_id
+from src.db.database import Base
+from src.db.seed import generate_tasks, generate_users, load_tasks, load_users, task_rows
+from src.task.constants import TaskStatus
+from src.task.models import Task
+
+
+def _depths(rows):
+    depth = {}
+    for row in rows:
+        depth[row["id"]] = depth[row["parent_id"]] + 1 if row["parent_id"] else 0
+    return depth
+
+
+def test_generate_tasks_is_deterministic_and_bounded():
+    rows = list(generate_tasks(2000, first_id=1, user_ids=[1, 2, 3], fork_ratio=0.5, max_depth=4, seed=7))
+    again = list(generate_tasks(2000, first_id=1, user_ids=[1, 2, 3], fork_ratio=0.5, max_depth=4, seed=7))
+
+    assert [row["name"] for row in rows] == [row["name"] for row in again]
+    assert max(_depths(rows).values()) == 3
+    owners = {row["id"]: row["user_id"] for row in rows}
+    assert all(owners[row["parent_id"]] == row["user_id"] for row in rows if row["parent_id"])
+    assert all((row["ended_at"] is None) == (row["status"] == TaskStatus.RUNNING) for row in rows)
+
+
+def test_task_rows_renumbers_and_remaps_parents():
+    records = [
+        {"id": 10, "name": "a", "status": "running", "parent_id": None},
+        {"id": 11, "name": "b", "status": "KILLED", "parent_id": 10, "username": "bob"},
+    ]
+    rows = list(task_rows(records, first_id=100, user_ids={"bob": 2}, default_user_id=1, keep_ids=False))
+
+    assert [(row["id"], row["parent_id"], row["user_id"], row["status"]) for row in rows] == [
+        (100, None, 1, TaskStatus.RUNNING),
+        (101, 100, 2, TaskStatus.KILLED),
+    ]
+    with pytest.raises(ValueError):
+        list(task_rows([{"id": 1, "name": "orphan", "parent_id": 5}], 1, {}, 1, keep_ids=False))
+
+
+def test_bulk_load_keeps_search_index_in_sync(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(bind=engine)
+
+    load_users(engine, generate_users(2, first_id=1, password="pw"))
+    stats = load_tasks(engine, generate_tasks(25_000, first_id=1, user_ids=[1, 2]))
+    finish_load(engine, [User.__table__, Task.__table__])
+
+    assert stats.rows == 25_000
+    assert next_id(engine, Task.__table__) == 25_001
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 2
+        indexed = conn.execute(text("SELECT count(*) FROM tasks_fts WHERE tasks_fts MATCH '\"rsync\"'")).scalar()
+        expected = conn.execute(text("SELECT count(*) FROM tasks WHERE name LIKE 'rsync %'")).scalar()
+        assert indexed == expected > 0
+        triggers = conn.exec_driver_sql("SELECT count(*) FROM sqlite_master WHERE type = 'trigger'").scalar()
+        assert triggers == 3
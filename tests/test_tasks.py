@@ -1,3 +1,6 @@
+import time
+
+
 def create_task(fast_api_test_client, name="Test Task", parent_id=None):
     response = fast_api_test_client.post("/tasks", json={"name": name, "parent_id": parent_id})
     return response.json()
@@ -77,3 +80,402 @@ def test_sorting(fast_api_test_client):
     names = [task["name"] for task in data if task["name"] in ["Zebra", "Alpha"]]
 
     assert names == sorted(names)
+
+
+def test_cursor_pagination(fast_api_test_client):
+    for i in range(5):
+        create_task(fast_api_test_client, name=f"Task{i % 2}")
+
+    for sort_by in ("created_at", "ended_at", "name", "status"):
+        expected = fast_api_test_client.get("/tasks", params={"sort_by": sort_by, "limit": 100}).json()["items"]
+
+        seen = []
+        data = fast_api_test_client.get("/tasks", params={"sort_by": sort_by, "limit": 2}).json()
+        seen.extend(data["items"])
+        while data["next_cursor"]:
+            data = fast_api_test_client.get(
+                "/tasks", params={"sort_by": sort_by, "limit": 2, "cursor": data["next_cursor"]}
+            ).json()
+            assert data["page"] is None
+            seen.extend(data["items"])
+        assert [t["id"] for t in seen] == [t["id"] for t in expected]
+
+        # Walk back from the last page
+        data = fast_api_test_client.get(
+            "/tasks", params={"sort_by": sort_by, "limit": 2, "cursor": data["prev_cursor"]}
+        ).json()
+        assert [t["id"] for t in data["items"]] == [t["id"] for t in expected[2:4]]
+
+
+def test_cursor_must_match_sort(fast_api_test_client):
+    for i in range(3):
+        create_task(fast_api_test_client, name=f"Task{i}")
+
+    data = fast_api_test_client.get("/tasks", params={"limit": 1}).json()
+    response = fast_api_test_client.get(
+        "/tasks", params={"limit": 1, "sort_by": "name", "cursor": data["next_cursor"]}
+    )
+    assert response.status_code == 400
+
+    response = fast_api_test_client.get("/tasks", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_search(fast_api_test_client):
+    for name in ("build kernel", "kernel panic", "Compile KERNEL modules", "backup"):
+        create_task(fast_api_test_client, name=name)
+    task = create_task(fast_api_test_client, name="rebuild kernel")
+    fast_api_test_client.post(f"/tasks/{task['id']}/fork")
+
+    data = fast_api_test_client.get("/tasks", params={"search": "kernel"}).json()
+    assert data["total"] == 5
+    assert all("kernel" in t["name"].lower() for t in data["items"])
+
+    data = fast_api_test_client.get("/tasks", params={"search": "ku"}).json()
+    assert [t["name"] for t in data["items"]] == ["backup"]
+
+    response = fast_api_test_client.get("/tasks", params={"search": "panic", "sort_by": "relevance"})
+    assert response.status_code == 200
+    assert [t["name"] for t in response.json()["items"]] == ["kernel panic"]
+
+    response = fast_api_test_client.get("/tasks", params={"sort_by": "relevance"})
+    assert response.status_code == 400
+
+
+def test_batch_create(fast_api_test_client):
+    response = fast_api_test_client.post("/tasks/batch", json=[{"name": f"Batch{i}"} for i in range(5)])
+    assert response.status_code == 201
+    created = response.json()
+    assert [t["name"] for t in created] == [f"Batch{i}" for i in range(5)]
+    assert len({t["id"] for t in created}) == 5
+
+    response = fast_api_test_client.post("/tasks/batch", json=[])
+    assert response.status_code == 422
+
+
+def test_fork_many(fast_api_test_client):
+    parent = create_task(fast_api_test_client, name="Parent")
+    response = fast_api_test_client.post(f"/tasks/{parent['id']}/fork", params={"count": 3})
+    assert response.status_code == 201
+    children = response.json()
+    assert len(children) == 3
+    assert all(child["parent_id"] == parent["id"] for child in children)
+
+    data = fast_api_test_client.get("/tasks", params={"parent": parent["id"]}).json()
+    assert data["total"] == 3
+
+
+def test_recursive_kill(fast_api_test_client):
+    root = create_task(fast_api_test_client, name="Root")
+    children = fast_api_test_client.post(f"/tasks/{root['id']}/fork", params={"count": 2}).json()
+    grandchild = fast_api_test_client.post(f"/tasks/{children[0]['id']}/fork").json()
+    fast_api_test_client.delete(f"/tasks/{children[1]['id']}")
+    unrelated = create_task(fast_api_test_client, name="Unrelated")
+
+    response = fast_api_test_client.delete(f"/tasks/{root['id']}", params={"recursive": True})
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["task_id"] == root["id"]
+    assert summary["killed"] == 3
+
+    assert fast_api_test_client.get(f"/tasks/{grandchild['id']}").json()["status"] == "killed"
+    assert fast_api_test_client.get(f"/tasks/{unrelated['id']}").json()["status"] == "running"
+
+
+def test_recursive_kill_deep_tree(fast_api_test_client):
+    from sqlalchemy import insert
+    from tests.conftest import TestingSessionLocal
+    from src.task.models import Task
+
+    root = create_task(fast_api_test_client, name="Deep")
+    with TestingSessionLocal() as db:
+        db.execute(insert(Task), [
+            {"id": root["id"] + i, "name": "Deep", "parent_id": root["id"] + i - 1, "user_id": 1}
+            for i in range(1, 3001)
+        ])
+        db.commit()
+
+    response = fast_api_test_client.delete(f"/tasks/{root['id']}", params={"recursive": True})
+    assert response.json()["killed"] == 3001
+
+
+def test_task_tree(fast_api_test_client):
+    import json
+
+    root = create_task(fast_api_test_client, name="Root")
+    children = fast_api_test_client.post(f"/tasks/{root['id']}/fork", params={"count": 2}).json()
+    grandchild = fast_api_test_client.post(f"/tasks/{children[0]['id']}/fork").json()
+
+    response = fast_api_test_client.get(f"/tasks/{root['id']}/tree", params={"include_counts": True})
+    assert response.status_code == 200
+    tree = response.json()
+    assert tree["id"] == root["id"]
+    assert tree["descendant_count"] == 3
+    assert [child["id"] for child in tree["children"]] == [child["id"] for child in children]
+    assert tree["children"][0]["children"][0]["path"] == [root["id"], children[0]["id"], grandchild["id"]]
+    assert tree["children"][0]["children"][0]["depth"] == 2
+
+    response = fast_api_test_client.get(f"/tasks/{root['id']}/tree", params={"format": "ndjson", "max_depth": 1})
+    nodes = [json.loads(line) for line in response.text.splitlines()]
+    assert [node["id"] for node in nodes] == [root["id"]] + [child["id"] for child in children]
+
+    response = fast_api_test_client.get(
+        f"/tasks/{root['id']}/tree", params={"format": "ndjson", "include_counts": True}
+    )
+    nodes = [json.loads(line) for line in response.text.splitlines()]
+    assert nodes[-1]["id"] == root["id"]
+    assert nodes[-1]["descendant_count"] == 3
+
+    assert fast_api_test_client.get("/tasks/9999/tree").status_code == 404
+
+
+def test_export(fast_api_test_client):
+    import csv
+    import io
+    import json
+
+    for i in range(3):
+        create_task(fast_api_test_client, name=f"Export{i}")
+    create_task(fast_api_test_client, name="Other")
+
+    response = fast_api_test_client.get("/tasks/export", params={"search": "Export", "sort_by": "name", "order": "asc"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["name"] for row in rows] == ["Export0", "Export1", "Export2"]
+    assert rows[0] == fast_api_test_client.get(f"/tasks/{rows[0]['id']}").json()
+
+    response = fast_api_test_client.get("/tasks/export", params={"format": "csv"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 4
+    assert rows[0]["status"] == "running"
+
+
+def test_total_modes(fast_api_test_client):
+    for i in range(3):
+        create_task(fast_api_test_client, name=f"Task{i}")
+
+    data = fast_api_test_client.get("/tasks", params={"limit": 2, "total": "none"}).json()
+    assert data["total"] is None
+    assert data["total_pages"] is None
+    assert data["next_page"] == 2
+    assert len(data["items"]) == 2
+
+    assert fast_api_test_client.get("/tasks", params={"total": "estimate"}).json()["total"] == 3
+
+    # Cached totals are invalidated by writes
+    assert fast_api_test_client.get("/tasks").json()["total"] == 3
+    create_task(fast_api_test_client, name="Task3")
+    assert fast_api_test_client.get("/tasks").json()["total"] == 4
+    fast_api_test_client.post("/tasks/1/fork")
+    assert fast_api_test_client.get("/tasks", params={"status": "running"}).json()["total"] == 5
+    fast_api_test_client.delete("/tasks/1")
+    assert fast_api_test_client.get("/tasks", params={"status": "running"}).json()["total"] == 4
+
+
+def test_conditional_get(fast_api_test_client):
+    task = create_task(fast_api_test_client, name="Polled")
+
+    response = fast_api_test_client.get(f"/tasks/{task['id']}")
+    etag = response.headers["etag"]
+    response = fast_api_test_client.get(f"/tasks/{task['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    listing = fast_api_test_client.get("/tasks", params={"limit": 5})
+    list_etag = listing.headers["etag"]
+    assert fast_api_test_client.get("/tasks", params={"limit": 5},
+                                    headers={"If-None-Match": list_etag}).status_code == 304
+    # Other query parameters are a different representation.
+    assert fast_api_test_client.get("/tasks", params={"limit": 6},
+                                    headers={"If-None-Match": list_etag}).status_code == 200
+
+    # Forking changes the listing but not the parent; killing changes both.
+    fast_api_test_client.post(f"/tasks/{task['id']}/fork")
+    assert fast_api_test_client.get(f"/tasks/{task['id']}", headers={"If-None-Match": etag}).status_code == 304
+    response = fast_api_test_client.get("/tasks", params={"limit": 5}, headers={"If-None-Match": list_etag})
+    assert response.status_code == 200
+    list_etag = response.headers["etag"]
+
+    fast_api_test_client.delete(f"/tasks/{task['id']}")
+    response = fast_api_test_client.get(f"/tasks/{task['id']}", headers={"If-None-Match": f'W/{etag}, "other"'})
+    assert response.status_code == 200
+    assert response.json()["status"] == "killed"
+    assert response.headers["etag"] != etag
+    assert fast_api_test_client.get("/tasks", params={"limit": 5},
+                                    headers={"If-None-Match": list_etag}).status_code == 200
+
+    response = fast_api_test_client.get("/tasks/9999", headers={"If-None-Match": "*"})
+    assert response.status_code == 404
+
+
+def test_conditional_list_does_not_count(fast_api_test_client):
+    from sqlalchemy import event
+
+    from tests.conftest import engine
+
+    for name in ("a", "b"):
+        create_task(fast_api_test_client, name=name)
+    params = {"limit": 1, "total": "none"}
+    etag = fast_api_test_client.get("/tasks", params=params).headers["etag"]
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = fast_api_test_client.get("/tasks", params=params, headers={"If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert response.status_code == 304
+    # Only the generation is read: no count, and the page itself is never queried.
+    assert not [statement for statement in statements if "count(" in statement.lower()]
+    assert not [statement for statement in statements if "from tasks" in statement.lower()]
+
+
+def test_list_json_matches_response_model(fast_api_test_client):
+    from datetime import datetime
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from tests.conftest import TestingSessionLocal
+    from src.auth.cache import UserSnapshot
+    from src.task.models import Task
+    from src.task.service import get_tasks, get_tasks_json
+
+    parent = create_task(fast_api_test_client, name='naïve "quoted"\ttask ✓')
+    fast_api_test_client.post(f"/tasks/{parent['id']}/fork")
+    fast_api_test_client.delete(f"/tasks/{parent['id']}")
+
+    with TestingSessionLocal() as db:
+        # Whole seconds serialize without a fractional part.
+        db.query(Task).filter(Task.id == parent["id"]).update({"ended_at": datetime(2026, 1, 1, 12, 0)})
+        db.commit()
+        user = UserSnapshot(id=1, username="tester", is_admin=False)
+        for params in ({"limit": 1}, {"sort_by": "name", "order": "asc"}, {"search": "quoted", "total_mode": "none"}):
+            expected = JSONResponse(jsonable_encoder(get_tasks(db, user, **params))).body
+            assert get_tasks_json(db, user, **params) == expected
+
+    response = fast_api_test_client.get("/tasks")
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["items"][1]["ended_at"] == "2026-01-01T12:00:00"
+
+
+def test_sparse_fields(fast_api_test_client):
+    import csv
+    import io
+
+    task = create_task(fast_api_test_client, name="Sparse")
+    for i in range(2):
+        fast_api_test_client.post(f"/tasks/{task['id']}/fork")
+
+    response = fast_api_test_client.get(f"/tasks/{task['id']}", params={"fields": "status, id"})
+    assert response.json() == {"id": task["id"], "status": "running"}
+    full_etag = fast_api_test_client.get(f"/tasks/{task['id']}").headers["etag"]
+    assert response.headers["etag"] != full_etag
+
+    # Cursors still work when the sort column is not among the fields.
+    data = fast_api_test_client.get("/tasks", params={"fields": "name", "sort_by": "created_at", "limit": 2}).json()
+    assert data["items"] == [{"name": "Sparse"}, {"name": "Sparse"}]
+    data = fast_api_test_client.get(
+        "/tasks", params={"fields": "name", "limit": 2, "cursor": data["next_cursor"]}
+    ).json()
+    assert data["items"] == [{"name": "Sparse"}]
+
+    response = fast_api_test_client.get("/tasks/export", params={"format": "csv", "fields": "id,parent_id", "order": "asc"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert rows[0] == {"id": str(task["id"]), "parent_id": ""}
+
+    assert fast_api_test_client.get("/tasks", params={"fields": "id,owner"}).status_code == 400
+    assert fast_api_test_client.get(f"/tasks/{task['id']}", params={"fields": ""}).status_code == 400
+
+
+def _wait_during(fast_api_test_client, task_id, kill):
+    import threading
+
+    from src.task.waiters import task_waiters
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(
+        fast_api_test_client.get(f"/tasks/{task_id}/wait", params={"timeout": 30})))
+    waiter.start()
+    while not task_waiters.count():
+        time.sleep(0.01)
+    kill()
+    waiter.join(timeout=10)
+    assert task_waiters.count() == 0
+    return results[0]
+
+
+def test_wait_for_task(fast_api_test_client):
+    task = create_task(fast_api_test_client, name="Waited on")
+    child = create_task(fast_api_test_client, name="Child", parent_id=task["id"])
+    assert fast_api_test_client.get(f"/tasks/{task['id']}/wait", params={"timeout": 0}).status_code == 204
+    assert fast_api_test_client.get("/tasks/9999/wait", params={"timeout": 0}).status_code == 404
+
+    # Parked waiters wake on a single kill and on a recursive one, well before the timeout.
+    started = time.monotonic()
+    response = _wait_during(fast_api_test_client, child["id"],
+                            lambda: fast_api_test_client.delete(f"/tasks/{child['id']}"))
+    assert response.status_code == 200
+    assert response.json()["status"] == "killed"
+    response = _wait_during(fast_api_test_client, task["id"],
+                            lambda: fast_api_test_client.delete(f"/tasks/{task['id']}", params={"recursive": True}))
+    assert response.json()["status"] == "killed"
+    assert time.monotonic() - started < 10
+
+    # A finished task is returned without waiting.
+    response = fast_api_test_client.get(f"/tasks/{task['id']}/wait", params={"fields": "id,status"})
+    assert response.json() == {"id": task["id"], "status": "killed"}
+
+
+def test_archive_finished_tasks(fast_api_test_client):
+    from datetime import timedelta
+    from sqlalchemy import func, select
+    from tests.conftest import TestingSessionLocal
+    from src.task.archive import archive_finished_tasks
+    from src.task.models import Task, TaskArchive
+
+    root = create_task(fast_api_test_client, name="Old root")
+    children = fast_api_test_client.post(f"/tasks/{root['id']}/fork", params={"count": 2}).json()
+    grandchild = fast_api_test_client.post(f"/tasks/{children[0]['id']}/fork").json()
+    fast_api_test_client.delete(f"/tasks/{root['id']}", params={"recursive": True})
+    live = create_task(fast_api_test_client, name="Old but running")
+
+    with TestingSessionLocal() as db:
+        # Nothing has been finished for a day yet.
+        assert archive_finished_tasks(db, timedelta(days=1), batch_size=1) == 0
+        # Leaves move first; each later pass moves the parents they left childless.
+        assert archive_finished_tasks(db, timedelta(0), batch_size=1) == 2
+        assert archive_finished_tasks(db, timedelta(0), batch_size=1) == 1
+        assert archive_finished_tasks(db, timedelta(0), batch_size=1) == 1
+        assert archive_finished_tasks(db, timedelta(0), batch_size=1) == 0
+        assert db.scalars(select(Task.id)).all() == [live["id"]]
+        assert db.scalar(select(func.count()).select_from(TaskArchive)) == 4
+
+    response = fast_api_test_client.get("/tasks")
+    assert [task["id"] for task in response.json()["items"]] == [live["id"]]
+    assert response.json()["total"] == 1
+    response = fast_api_test_client.get("/tasks", params={"include_archived": True, "status": "killed"})
+    assert response.json()["total"] == 4
+
+    # Cursor pages and search run over both tables alike.
+    ids, cursor = [], None
+    while True:
+        params = {"include_archived": True, "limit": 2, "sort_by": "created_at", "order": "asc"}
+        page = fast_api_test_client.get("/tasks", params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        ids += [task["id"] for task in page["items"]]
+        cursor = page.get("next_cursor")
+        if not cursor:
+            break
+    assert ids == [root["id"], *(child["id"] for child in children), grandchild["id"], live["id"]]
+    # Forks keep their parent's name.
+    response = fast_api_test_client.get("/tasks", params={"include_archived": True, "search": "root"})
+    assert {task["id"] for task in response.json()["items"]} == set(ids) - {live["id"]}
+
+    # Single reads and trees fall back to the archive; archived tasks are read-only.
+    assert fast_api_test_client.get(f"/tasks/{grandchild['id']}").json()["status"] == "killed"
+    assert fast_api_test_client.get(f"/tasks/{root['id']}/wait").json()["id"] == root["id"]
+    tree = fast_api_test_client.get(f"/tasks/{root['id']}/tree").json()
+    assert [child["id"] for child in tree["children"]] == [child["id"] for child in children]
+    assert fast_api_test_client.post(f"/tasks/{root['id']}/fork").status_code == 400
+    assert fast_api_test_client.delete(f"/tasks/{root['id']}").status_code == 400